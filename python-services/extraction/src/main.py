@@ -8,7 +8,7 @@
 
 @module python-services/extraction/src/main
 @since Epic 2 - Story 2.2 (File OCR Extraction Service)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 
 @features
   - FastAPI 異步 HTTP 服務
@@ -19,16 +19,25 @@
 
 import os
 from contextlib import asynccontextmanager
-from typing import Optional
+from functools import lru_cache, partial
+from typing import Any, Iterator, Optional, Union
 
 import structlog
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, HttpUrl
-from pydantic_settings import BaseSettings
-
-from ocr import AzureDocumentIntelligenceClient, DocumentProcessor
-from security import SsrfBlockedError, assert_safe_url
+from pydantic_core import to_json
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from ocr import (
+    AsyncBatchQueue,
+    AzureDocumentIntelligenceClient,
+    BlobStagingClient,
+    DocumentProcessor,
+    OcrResultCache,
+)
+from security import SsrfBlockedError, UploadSizeLimitMiddleware, assert_safe_url
 
 
 # ============================================================
@@ -54,6 +63,68 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0", alias="HOST")
     port: int = Field(default=8000, alias="PORT")
     debug: bool = Field(default=False, alias="DEBUG")
+    workers: int = Field(
+        default=os.cpu_count() or 1,
+        alias="WEB_CONCURRENCY",
+        description="uvicorn worker 數（DEBUG 模式固定為 1）",
+    )
+
+    # Blob 暫存（大型上傳改由 Azure DI 從 SAS URL 拉取）
+    azure_storage_connection_string: str = Field(
+        default="",
+        alias="AZURE_STORAGE_CONNECTION_STRING",
+        description="Azure Storage 連接字串（未設定時停用 Blob 暫存）",
+    )
+    azure_storage_container: str = Field(
+        default="ocr-staging",
+        alias="AZURE_STORAGE_CONTAINER",
+        description="Blob 暫存容器名稱",
+    )
+    blob_upload_threshold_mb: int = Field(
+        default=20,
+        alias="BLOB_UPLOAD_THRESHOLD_MB",
+        description="超過此大小（MB）的上傳改走 Blob SAS URL",
+    )
+    blob_sas_ttl_seconds: int = Field(
+        default=120,
+        alias="BLOB_SAS_TTL_SECONDS",
+        description="Blob SAS URL 有效時間（秒，每次呼叫 Azure DI 前重新簽發）",
+    )
+
+    # 微批次（聚合短時間內到達的請求後並行派送）
+    batch_enabled: bool = Field(default=False, alias="BATCH_ENABLED")
+    batch_max_size: int = Field(
+        default=8,
+        alias="BATCH_MAX_SIZE",
+        description="單一批次最大請求數",
+    )
+    batch_max_wait_ms: int = Field(
+        default=50,
+        alias="BATCH_MAX_WAIT_MS",
+        description="批次收集最長等待時間（毫秒）",
+    )
+
+    # OCR 結果快取（以文件內容雜湊為鍵）
+    ocr_cache_maxsize: int = Field(
+        default=512,
+        alias="OCR_CACHE_MAXSIZE",
+        description="本機 OCR 結果快取筆數（0 表示停用快取）",
+    )
+    ocr_cache_max_mb: int = Field(
+        default=256,
+        alias="OCR_CACHE_MAX_MB",
+        description="本機 OCR 結果快取總大小上限（MB，含 rawResult 的結果可達數 MB）",
+    )
+    ocr_cache_ttl_seconds: int = Field(
+        default=3600,
+        alias="OCR_CACHE_TTL_SECONDS",
+        description="OCR 結果快取有效時間（秒）",
+    )
+    redis_url: str = Field(
+        default="",
+        alias="REDIS_URL",
+        description="Redis 連接字串（可選，跨 worker 共享 OCR 結果快取）",
+    )
 
     # CORS
     cors_origins: str = Field(
@@ -63,15 +134,41 @@ class Settings(BaseSettings):
     )
 
     # Processing
+    max_upload_mb: int = Field(
+        default=500,
+        alias="MAX_UPLOAD_MB",
+        description="上傳文件大小上限（MB，Azure DI 單檔上限為 500 MB）",
+    )
     max_retries: int = Field(default=3, alias="MAX_RETRIES")
     retry_delay: float = Field(default=1.0, alias="RETRY_DELAY")
+    max_backoff: float = Field(
+        default=30.0,
+        alias="MAX_BACKOFF",
+        description="單次重試等待上限（秒）",
+    )
+
+    # Azure DI 限流
+    azure_max_concurrency: int = Field(
+        default=8,
+        alias="AZURE_MAX_CONCURRENCY",
+        description="同時進行的 Azure DI 呼叫上限",
+    )
+    azure_min_interval_ms: int = Field(
+        default=100,
+        alias="AZURE_MIN_INTERVAL_MS",
+        description="相鄰兩次 Azure DI 呼叫的最小間隔（毫秒）",
+    )
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
 
-    class Config:
-        env_file = ".env"
-        extra = "ignore"
+@lru_cache
+def get_settings() -> Settings:
+    """取得設定（僅解析一次環境變數與 .env）"""
+    return Settings()
 
 
-settings = Settings()
+settings = get_settings()
 
 
 # ============================================================
@@ -107,6 +204,7 @@ class ExtractUrlRequest(BaseModel):
     """URL 提取請求"""
     documentUrl: HttpUrl = Field(..., description="文件 URL（需要 SAS token）")
     documentId: Optional[str] = Field(None, description="文件 ID（用於追蹤）")
+    includeRaw: bool = Field(False, description="是否回傳 Azure DI 原始結果（rawResult）")
 
 
 class ExtractResponse(BaseModel):
@@ -131,23 +229,53 @@ class HealthResponse(BaseModel):
     azureConfigured: bool
 
 
+# 設定於啟動後不變，健康檢查回應只需建立一次
+AZURE_CONFIGURED = bool(settings.azure_di_endpoint and settings.azure_di_key)
+_HEALTHY = HealthResponse(
+    status="healthy",
+    service="ocr-extraction",
+    version="1.0.0",
+    azureConfigured=AZURE_CONFIGURED,
+)
+
+
 # ============================================================
 # Application
 # ============================================================
 
 # 全域處理器實例
 processor: Optional[DocumentProcessor] = None
+blob_staging: Optional[BlobStagingClient] = None
+batch_queue: Optional[AsyncBatchQueue] = None
+result_cache: Optional[OcrResultCache] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """應用程式生命週期管理"""
-    global processor
+    global processor, blob_staging, batch_queue, result_cache
 
     logger.info("application_startup")
 
+    # 初始化 Blob 暫存（可選）
+    if settings.azure_storage_connection_string:
+        blob_staging = BlobStagingClient(
+            connection_string=settings.azure_storage_connection_string,
+            container=settings.azure_storage_container,
+            sas_ttl_seconds=settings.blob_sas_ttl_seconds,
+        )
+
+    # 初始化 OCR 結果快取（可選）
+    if settings.ocr_cache_maxsize > 0:
+        result_cache = OcrResultCache(
+            maxsize=settings.ocr_cache_maxsize,
+            max_bytes=settings.ocr_cache_max_mb * 1024 * 1024,
+            ttl_seconds=settings.ocr_cache_ttl_seconds,
+            redis_url=settings.redis_url,
+        )
+
     # 初始化 Azure 客戶端和處理器
-    if settings.azure_di_endpoint and settings.azure_di_key:
+    if AZURE_CONFIGURED:
         azure_client = AzureDocumentIntelligenceClient(
             endpoint=settings.azure_di_endpoint,
             api_key=settings.azure_di_key,
@@ -156,13 +284,38 @@ async def lifespan(app: FastAPI):
             azure_client=azure_client,
             max_retries=settings.max_retries,
             retry_delay=settings.retry_delay,
+            max_concurrency=settings.azure_max_concurrency,
+            min_interval_ms=settings.azure_min_interval_ms,
+            max_backoff=settings.max_backoff,
+            blob_staging=blob_staging,
+            blob_upload_threshold=settings.blob_upload_threshold_mb * 1024 * 1024,
+            result_cache=result_cache,
         )
         logger.info("azure_client_initialized")
+
+        if settings.batch_enabled:
+            batch_queue = AsyncBatchQueue(
+                max_batch_size=settings.batch_max_size,
+                max_wait_ms=settings.batch_max_wait_ms,
+            )
+            batch_queue.start()
     else:
         logger.warning("azure_credentials_not_configured")
 
     yield
 
+    if batch_queue is not None:
+        await batch_queue.stop()
+
+    if processor is not None:
+        processor.azure_client.close()
+
+    if blob_staging is not None:
+        await blob_staging.close()
+
+    if result_cache is not None:
+        await result_cache.close()
+
     logger.info("application_shutdown")
 
 
@@ -173,33 +326,93 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS 設定
+# CORS 設定（去除空白與空項目）
+CORS_ORIGINS = tuple(
+    origin.strip() for origin in settings.cors_origins.split(",") if origin.strip()
+)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins.split(","),
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# 上傳大小限制（在解析 multipart body 前拒絕超大上傳）
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_bytes=settings.max_upload_mb * 1024 * 1024,
+)
+
 
 # ============================================================
 # Routes
 # ============================================================
 
+async def _run_processing(job) -> dict:
+    """執行 OCR 處理（啟用微批次時經由批次佇列派送）"""
+    if batch_queue is not None:
+        return await batch_queue.submit(job)
+    return await job()
+
+
+def _iter_raw_result_json(
+    summary: dict[str, Any], raw_result: dict[str, Any]
+) -> Iterator[bytes]:
+    """
+    分段輸出含 rawResult 的回應 JSON
+
+    rawResult 依頂層鍵（陣列再依元素）逐段序列化，
+    避免整份 JSON 於記憶體中組裝完成後才開始寫出。
+    """
+    yield to_json(summary)[:-1] + b',"rawResult":{'
+
+    for index, (key, value) in enumerate(raw_result.items()):
+        prefix = b"," if index else b""
+        if isinstance(value, list):
+            yield prefix + to_json(key) + b":["
+            for item_index, item in enumerate(value):
+                yield (b"," if item_index else b"") + to_json(item)
+            yield b"]"
+        else:
+            yield prefix + to_json(key) + b":" + to_json(value)
+
+    yield b"}}"
+
+
+def _build_extract_response(
+    result: dict[str, Any],
+) -> Union[ExtractResponse, StreamingResponse]:
+    """
+    建立提取響應
+
+    不含 rawResult 時回傳 ExtractResponse（由 response_model 序列化）；
+    含 rawResult 時以 StreamingResponse 分段輸出（於執行緒池中序列化）。
+    """
+    # result 由 DocumentProcessor 產生，結構可信，略過逐欄位驗證
+    raw_result = result.get("rawResult")
+    if raw_result is None:
+        return ExtractResponse.model_construct(**result)
+
+    summary = ExtractResponse.model_construct(**result).model_dump(
+        exclude={"rawResult"}
+    )
+    return StreamingResponse(
+        _iter_raw_result_json(summary, raw_result),
+        media_type="application/json",
+    )
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
     """健康檢查端點"""
-    return HealthResponse(
-        status="healthy",
-        service="ocr-extraction",
-        version="1.0.0",
-        azureConfigured=bool(settings.azure_di_endpoint and settings.azure_di_key),
-    )
+    return _HEALTHY
 
 
 @app.post("/extract/url", response_model=ExtractResponse)
-async def extract_from_url(request: ExtractUrlRequest) -> ExtractResponse:
+async def extract_from_url(
+    request: ExtractUrlRequest,
+) -> Union[ExtractResponse, StreamingResponse]:
     """
     從 URL 提取文件內容
 
@@ -235,25 +448,31 @@ async def extract_from_url(request: ExtractUrlRequest) -> ExtractResponse:
         url=str(request.documentUrl)[:100],
     )
 
-    result = await processor.process_from_url(
-        document_url=str(request.documentUrl),
-        document_id=request.documentId,
+    result = await _run_processing(
+        partial(
+            processor.process_from_url,
+            document_url=str(request.documentUrl),
+            document_id=request.documentId,
+            include_raw=request.includeRaw,
+        )
     )
 
-    return ExtractResponse(**result)
+    return _build_extract_response(result)
 
 
 @app.post("/extract/file", response_model=ExtractResponse)
 async def extract_from_file(
     file: UploadFile = File(..., description="要處理的文件"),
     documentId: Optional[str] = Form(None, description="文件 ID"),
-) -> ExtractResponse:
+    includeRaw: bool = Form(False, description="是否回傳 Azure DI 原始結果"),
+) -> Union[ExtractResponse, StreamingResponse]:
     """
     從上傳文件提取內容
 
     Args:
         file: 上傳的文件
         documentId: 文件 ID（可選）
+        includeRaw: 是否回傳 Azure DI 原始結果
 
     Returns:
         OCR 提取結果
@@ -272,24 +491,33 @@ async def extract_from_file(
             detail=f"Unsupported file type: {content_type}",
         )
 
-    # 讀取文件內容
-    document_bytes = await file.read()
+    # 上傳內容已由 Starlette 以 SpooledTemporaryFile 落地（大檔溢出至磁碟），
+    # 直接傳遞檔案物件給 Azure SDK 串流上傳，避免整份讀入記憶體
+    document_size = file.size
+    if document_size is None:
+        document_size = file.file.seek(0, os.SEEK_END)
+    file.file.seek(0)
 
     logger.info(
         "extract_file_request",
         document_id=documentId,
         filename=file.filename,
         content_type=content_type,
-        size=len(document_bytes),
+        size=document_size,
     )
 
-    result = await processor.process_from_bytes(
-        document_bytes=document_bytes,
-        content_type=content_type,
-        document_id=documentId,
+    result = await _run_processing(
+        partial(
+            processor.process_from_url_or_upload,
+            document_body=file.file,
+            content_type=content_type,
+            document_id=documentId,
+            size=document_size,
+            include_raw=includeRaw,
+        )
     )
 
-    return ExtractResponse(**result)
+    return _build_extract_response(result)
 
 
 # ============================================================
@@ -304,4 +532,7 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.debug else settings.workers,
     )
@@ -5,6 +5,15 @@ OCR Module
 """
 
 from .azure_di import AzureDocumentIntelligenceClient
+from .batch_queue import AsyncBatchQueue
+from .blob_staging import BlobStagingClient
 from .processor import DocumentProcessor
+from .result_cache import OcrResultCache
 
-__all__ = ["AzureDocumentIntelligenceClient", "DocumentProcessor"]
+__all__ = [
+    "AsyncBatchQueue",
+    "AzureDocumentIntelligenceClient",
+    "BlobStagingClient",
+    "DocumentProcessor",
+    "OcrResultCache",
+]
@@ -8,29 +8,86 @@
 
 @module python-services/extraction/src/ocr/azure_di
 @since Epic 2 - Story 2.2 (File OCR Extraction Service)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 
 @features
   - Azure Document Intelligence 客戶端初始化
   - 發票模型 (prebuilt-invoice) OCR 分析
-  - URL 和 Bytes 兩種輸入方式支援
+  - URL 和 Bytes / 檔案串流兩種輸入方式支援
   - 錯誤處理和重試機制
+  - 同步 SDK 輪詢與結果解析移至執行緒池，不阻塞事件迴圈
+  - 共用 HTTP 連線池（keep-alive），避免重複 TLS 握手
 """
 
+import asyncio
+import os
+import statistics
 import time
-from typing import Any, Optional
+from typing import IO, Any, Optional, Union
+import requests
 import structlog
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from azure.ai.documentintelligence import DocumentIntelligenceClient
 from azure.ai.documentintelligence.models import (
     AnalyzeResult,
     AnalyzeDocumentRequest,
+    CurrencyValue,
     DocumentAnalysisFeature,
 )
 from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import HttpResponseError
+from azure.core.pipeline.transport import RequestsTransport
 
 logger = structlog.get_logger(__name__)
 
+# 標準發票欄位映射：(本地欄位, Azure DI 欄位)
+_FIELD_MAPPINGS: tuple[tuple[str, str], ...] = (
+    ("vendorName", "VendorName"),
+    ("vendorAddress", "VendorAddress"),
+    ("customerName", "CustomerName"),
+    ("customerAddress", "CustomerAddress"),
+    ("invoiceId", "InvoiceId"),
+    ("invoiceDate", "InvoiceDate"),
+    ("dueDate", "DueDate"),
+    ("purchaseOrder", "PurchaseOrder"),
+    ("subTotal", "SubTotal"),
+    ("totalTax", "TotalTax"),
+    ("invoiceTotal", "InvoiceTotal"),
+    ("amountDue", "AmountDue"),
+    ("currency", "CurrencyCode"),
+)
+
+# Azure DI 欄位 → 本地欄位（走訪欄位時的反查表）
+_LOCAL_FIELD_KEYS: dict[str, str] = {
+    azure_key: local_key for local_key, azure_key in _FIELD_MAPPINGS
+}
+
+# 項目明細欄位映射：(本地欄位, Azure DI 欄位)
+_ITEM_MAPPINGS: tuple[tuple[str, str], ...] = (
+    ("description", "Description"),
+    ("quantity", "Quantity"),
+    ("unit", "Unit"),
+    ("unitPrice", "UnitPrice"),
+    ("amount", "Amount"),
+    ("productCode", "ProductCode"),
+)
+
+
+def _extract_field_value(field: Any) -> Any:
+    """提取欄位值"""
+    if not field:
+        return None
+
+    # 依值型別分派（日期類型直接回傳，由 pydantic-core 於回應序列化時輸出 ISO 8601）
+    value = getattr(field, "value", None)
+    if isinstance(value, CurrencyValue):
+        return {
+            "amount": float(value.amount) if value.amount is not None else None,
+            "currencyCode": value.currency_code,
+        }
+    return value
+
 
 class AzureDocumentIntelligenceClient:
     """
@@ -39,26 +96,46 @@ class AzureDocumentIntelligenceClient:
     封裝 Azure DI SDK，提供發票 OCR 功能
     """
 
-    def __init__(self, endpoint: str, api_key: str):
+    def __init__(self, endpoint: str, api_key: str, pool_maxsize: int = 64):
         """
         初始化客戶端
 
         Args:
             endpoint: Azure Document Intelligence 端點 URL
             api_key: Azure API 金鑰
+            pool_maxsize: HTTP 連線池大小（需涵蓋並發分析與輪詢數）
         """
         self.endpoint = endpoint
+
+        # 預設連線池僅 10 條連線，並發時會不斷重建 TLS 連線；
+        # 重試由 azure-core 的 RetryPolicy 負責，停用 urllib3 層重試
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
         self.client = DocumentIntelligenceClient(
             endpoint=endpoint,
             credential=AzureKeyCredential(api_key),
+            transport=RequestsTransport(session=self._session, session_owner=False),
         )
         self.model_id = "prebuilt-invoice"  # 使用發票預建模型
         logger.info("azure_di_client_initialized", endpoint=endpoint)
 
+    def close(self) -> None:
+        """關閉 SDK 客戶端與共用連線池"""
+        self.client.close()
+        self._session.close()
+
     async def analyze_document_from_url(
         self,
         document_url: str,
         features: Optional[list[str]] = None,
+        include_raw: bool = False,
     ) -> dict[str, Any]:
         """
         從 URL 分析文件
@@ -66,6 +143,7 @@ class AzureDocumentIntelligenceClient:
         Args:
             document_url: 文件 URL（需要公開訪問或有 SAS token）
             features: 額外的分析特性（可選）
+            include_raw: 是否附帶 Azure DI 原始結果（rawResult）
 
         Returns:
             分析結果字典，包含原始結果和結構化數據
@@ -77,16 +155,13 @@ class AzureDocumentIntelligenceClient:
             # 準備分析請求
             analyze_request = AnalyzeDocumentRequest(url_source=document_url)
 
-            # 執行分析（同步 API，使用長輪詢）
-            poller = self.client.begin_analyze_document(
-                model_id=self.model_id,
-                analyze_request=analyze_request,
+            # 執行分析（同步 API 長輪詢，於執行緒池中等待結果）
+            result = await asyncio.to_thread(
+                self._blocking_analyze,
+                body=analyze_request,
                 features=self._get_features(features),
             )
 
-            # 等待結果
-            result: AnalyzeResult = poller.result()
-
             processing_time = int((time.time() - start_time) * 1000)
             logger.info(
                 "analyze_document_complete",
@@ -94,7 +169,10 @@ class AzureDocumentIntelligenceClient:
                 page_count=len(result.pages) if result.pages else 0,
             )
 
-            return self._parse_result(result, processing_time)
+            # 解析（含 as_dict() 遞迴轉換）為 CPU 密集工作，同樣移至執行緒池
+            return await asyncio.to_thread(
+                self._parse_result, result, processing_time, include_raw
+            )
 
         except HttpResponseError as e:
             logger.error(
@@ -106,36 +184,35 @@ class AzureDocumentIntelligenceClient:
 
     async def analyze_document_from_bytes(
         self,
-        document_bytes: bytes,
+        document_body: Union[bytes, IO[bytes]],
         content_type: str = "application/pdf",
         features: Optional[list[str]] = None,
+        include_raw: bool = False,
     ) -> dict[str, Any]:
         """
-        從 bytes 分析文件
+        從 bytes 或檔案串流分析文件
 
         Args:
-            document_bytes: 文件二進制數據
+            document_body: 文件二進制數據或可 seek 的二進制檔案物件
             content_type: MIME 類型
             features: 額外的分析特性（可選）
+            include_raw: 是否附帶 Azure DI 原始結果（rawResult）
 
         Returns:
             分析結果字典
         """
         start_time = time.time()
-        logger.info("analyze_document_bytes_start", size=len(document_bytes))
+        logger.info("analyze_document_bytes_start", size=self._body_size(document_body))
 
         try:
-            # 執行分析（使用 bytes 輸入）
-            poller = self.client.begin_analyze_document(
-                model_id=self.model_id,
-                analyze_request=document_bytes,
+            # 執行分析（使用 bytes / 串流輸入，於執行緒池中等待結果）
+            result = await asyncio.to_thread(
+                self._blocking_analyze,
+                body=document_body,
                 content_type=content_type,
                 features=self._get_features(features),
             )
 
-            # 等待結果
-            result: AnalyzeResult = poller.result()
-
             processing_time = int((time.time() - start_time) * 1000)
             logger.info(
                 "analyze_document_bytes_complete",
@@ -143,7 +220,10 @@ class AzureDocumentIntelligenceClient:
                 page_count=len(result.pages) if result.pages else 0,
             )
 
-            return self._parse_result(result, processing_time)
+            # 解析（含 as_dict() 遞迴轉換）為 CPU 密集工作，同樣移至執行緒池
+            return await asyncio.to_thread(
+                self._parse_result, result, processing_time, include_raw
+            )
 
         except HttpResponseError as e:
             logger.error(
@@ -153,6 +233,39 @@ class AzureDocumentIntelligenceClient:
             )
             raise
 
+    @staticmethod
+    def _body_size(document_body: Union[bytes, IO[bytes]]) -> int:
+        """
+        取得文件大小
+
+        檔案物件會被倒回開頭，重試時可從頭重新上傳。
+        """
+        if isinstance(document_body, (bytes, bytearray)):
+            return len(document_body)
+
+        size = document_body.seek(0, os.SEEK_END)
+        document_body.seek(0)
+        return size
+
+    def _blocking_analyze(self, **kwargs: Any) -> AnalyzeResult:
+        """
+        執行同步分析並等待長輪詢完成
+
+        SDK 的 begin_analyze_document / poller.result() 為阻塞呼叫，
+        必須透過 asyncio.to_thread 呼叫，避免佔住 uvicorn 事件迴圈。
+
+        Args:
+            **kwargs: 傳遞給 begin_analyze_document 的參數
+
+        Returns:
+            Azure DI 原始分析結果
+        """
+        poller = self.client.begin_analyze_document(
+            model_id=self.model_id,
+            **kwargs,
+        )
+        return poller.result()
+
     def _get_features(
         self, features: Optional[list[str]]
     ) -> Optional[list[DocumentAnalysisFeature]]:
@@ -167,7 +280,10 @@ class AzureDocumentIntelligenceClient:
         return [feature_map[f] for f in features if f in feature_map]
 
     def _parse_result(
-        self, result: AnalyzeResult, processing_time: int
+        self,
+        result: AnalyzeResult,
+        processing_time: int,
+        include_raw: bool = False,
     ) -> dict[str, Any]:
         """
         解析 Azure DI 分析結果
@@ -175,51 +291,31 @@ class AzureDocumentIntelligenceClient:
         Args:
             result: Azure DI 原始分析結果
             processing_time: 處理時間（毫秒）
+            include_raw: 是否轉換並附帶原始結果（大型文件的 as_dict() 成本很高）
 
         Returns:
             結構化的分析結果字典
         """
-        # 提取文字內容
-        extracted_text = result.content or ""
-
-        # 計算整體信心度（基於文件中所有欄位的平均信心度）
-        confidence = self._calculate_confidence(result)
-
-        # 提取發票數據
-        invoice_data = self._extract_invoice_data(result)
+        # 單次走訪所有欄位，同時累計信心度並提取發票數據
+        confidences, invoice_data = self._walk_documents(result)
 
         return {
-            "rawResult": result.as_dict(),
-            "extractedText": extracted_text,
+            "rawResult": result.as_dict() if include_raw else None,
+            "extractedText": result.content or "",
             "invoiceData": invoice_data,
             "processingTime": processing_time,
             "pageCount": len(result.pages) if result.pages else 0,
-            "confidence": confidence,
+            # 整體信心度（基於文件中所有欄位的平均信心度）
+            "confidence": (
+                round(statistics.fmean(confidences), 4) if confidences else 0.0
+            ),
         }
 
-    def _calculate_confidence(self, result: AnalyzeResult) -> float:
-        """計算整體信心度"""
-        if not result.documents:
-            return 0.0
-
-        total_confidence = 0.0
-        field_count = 0
-
-        for doc in result.documents:
-            if doc.fields:
-                for field in doc.fields.values():
-                    if field and hasattr(field, "confidence") and field.confidence:
-                        total_confidence += field.confidence
-                        field_count += 1
-
-        if field_count == 0:
-            return 0.0
-
-        return round(total_confidence / field_count, 4)
-
-    def _extract_invoice_data(self, result: AnalyzeResult) -> dict[str, Any]:
+    def _walk_documents(
+        self, result: AnalyzeResult
+    ) -> tuple[list[float], dict[str, Any]]:
         """
-        從分析結果提取發票數據
+        單次走訪分析結果，收集欄位信心度並提取發票數據
 
         提取欄位包括：
         - 供應商資訊 (VendorName, VendorAddress)
@@ -227,65 +323,27 @@ class AzureDocumentIntelligenceClient:
         - 發票資訊 (InvoiceId, InvoiceDate, DueDate)
         - 金額 (SubTotal, TotalTax, InvoiceTotal)
         - 項目明細 (Items)
-        """
-        if not result.documents:
-            return {}
 
+        Returns:
+            tuple: (所有欄位的信心度列表, 發票數據)
+        """
+        confidences: list[float] = []
         invoice_data: dict[str, Any] = {}
 
-        for doc in result.documents:
-            if not doc.fields:
-                continue
-
-            # 提取標準發票欄位
-            field_mappings = {
-                "vendorName": "VendorName",
-                "vendorAddress": "VendorAddress",
-                "customerName": "CustomerName",
-                "customerAddress": "CustomerAddress",
-                "invoiceId": "InvoiceId",
-                "invoiceDate": "InvoiceDate",
-                "dueDate": "DueDate",
-                "purchaseOrder": "PurchaseOrder",
-                "subTotal": "SubTotal",
-                "totalTax": "TotalTax",
-                "invoiceTotal": "InvoiceTotal",
-                "amountDue": "AmountDue",
-                "currency": "CurrencyCode",
-            }
+        for doc in result.documents or ():
+            for azure_key, field in (doc.fields or {}).items():
+                if not field:
+                    continue
 
-            for local_key, azure_key in field_mappings.items():
-                field = doc.fields.get(azure_key)
-                if field:
-                    invoice_data[local_key] = self._extract_field_value(field)
+                if confidence := getattr(field, "confidence", None):
+                    confidences.append(confidence)
 
-            # 提取項目明細
-            items_field = doc.fields.get("Items")
-            if items_field and items_field.value:
-                invoice_data["items"] = self._extract_line_items(items_field.value)
+                if (local_key := _LOCAL_FIELD_KEYS.get(azure_key)) is not None:
+                    invoice_data[local_key] = _extract_field_value(field)
+                elif azure_key == "Items" and field.value:
+                    invoice_data["items"] = self._extract_line_items(field.value)
 
-        return invoice_data
-
-    def _extract_field_value(self, field: Any) -> Any:
-        """提取欄位值"""
-        if not field:
-            return None
-
-        # 處理不同類型的值
-        if hasattr(field, "value"):
-            value = field.value
-            # 處理日期類型
-            if hasattr(value, "isoformat"):
-                return value.isoformat()
-            # 處理貨幣類型
-            if hasattr(value, "amount"):
-                return {
-                    "amount": float(value.amount) if value.amount else None,
-                    "currencyCode": getattr(value, "currency_code", None),
-                }
-            return value
-
-        return None
+        return confidences, invoice_data
 
     def _extract_line_items(self, items: list[Any]) -> list[dict[str, Any]]:
         """提取項目明細"""
@@ -295,24 +353,15 @@ class AzureDocumentIntelligenceClient:
             if not hasattr(item, "value") or not item.value:
                 continue
 
-            item_data = {}
             item_fields = item.value
 
             # 提取項目欄位
-            item_mappings = {
-                "description": "Description",
-                "quantity": "Quantity",
-                "unit": "Unit",
-                "unitPrice": "UnitPrice",
-                "amount": "Amount",
-                "productCode": "ProductCode",
+            item_data = {
+                local_key: _extract_field_value(item_fields[azure_key])
+                for local_key, azure_key in _ITEM_MAPPINGS
+                if azure_key in item_fields
             }
 
-            for local_key, azure_key in item_mappings.items():
-                if azure_key in item_fields:
-                    field = item_fields[azure_key]
-                    item_data[local_key] = self._extract_field_value(field)
-
             if item_data:
                 line_items.append(item_data)
 
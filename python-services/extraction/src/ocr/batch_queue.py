@@ -0,0 +1,135 @@
+"""
+@fileoverview 非同步微批次佇列
+@description
+  將短時間內到達的 OCR 請求聚合為批次後統一派送：
+  - 在 max_wait_ms 內或累積至 max_batch_size 時成批
+  - 批次內請求並行執行（受 DocumentProcessor 的並發上限約束）
+  - 每個呼叫端等待各自的 Future 取得結果
+
+@module python-services/extraction/src/ocr/batch_queue
+@since Epic 2 - Story 2.2 (File OCR Extraction Service)
+@lastModified 2026-10-15
+
+@features
+  - asyncio.Queue + Future 的請求聚合
+  - 背景派送迴圈（於 lifespan 啟動/停止）
+  - 例外逐一回傳給對應呼叫端
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+BatchJob = Callable[[], Awaitable[dict[str, Any]]]
+
+
+class AsyncBatchQueue:
+    """
+    非同步微批次佇列
+
+    收集 (job, Future) 並以批次派送，呼叫端透過 submit() 等待結果
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait_ms: int = 50):
+        """
+        初始化佇列
+
+        Args:
+            max_batch_size: 單一批次最大請求數
+            max_wait_ms: 批次收集最長等待時間（毫秒）
+        """
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._queue: asyncio.Queue[tuple[BatchJob, asyncio.Future]] = asyncio.Queue()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._dispatch_tasks: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """啟動背景派送迴圈"""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._process_loop())
+            logger.info(
+                "batch_queue_started",
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=int(self.max_wait * 1000),
+            )
+
+    async def stop(self) -> None:
+        """停止派送迴圈，並等待已派送的批次完成"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+        if self._dispatch_tasks:
+            await asyncio.gather(*self._dispatch_tasks, return_exceptions=True)
+
+        # 尚未派送的請求直接取消
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+        logger.info("batch_queue_stopped")
+
+    async def submit(self, job: BatchJob) -> dict[str, Any]:
+        """
+        提交請求並等待結果
+
+        Args:
+            job: 無參數的協程函數（實際執行 OCR 處理）
+
+        Returns:
+            job 的回傳結果
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def _collect_batch(self) -> list[tuple[BatchJob, asyncio.Future]]:
+        """等待第一筆請求後，在時限內盡量收集同批請求"""
+        batch = [await self._queue.get()]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _process_loop(self) -> None:
+        """背景派送迴圈（派送不阻塞下一批的收集）"""
+        while True:
+            batch = await self._collect_batch()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatch_tasks.add(task)
+            task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, batch: list[tuple[BatchJob, asyncio.Future]]) -> None:
+        """並行執行批次，並將結果/例外回填至各自的 Future"""
+        batch = [(job, future) for job, future in batch if not future.done()]
+        logger.debug("batch_dispatch", size=len(batch))
+
+        results = await asyncio.gather(
+            *(job() for job, _ in batch),
+            return_exceptions=True,
+        )
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # 呼叫端已取消
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,133 @@
+"""
+@fileoverview Azure Blob 暫存上傳
+@description
+  大型上傳文件改由 Azure Document Intelligence 直接從 Blob 拉取：
+  - 上傳文件至暫存容器
+  - 每次呼叫 Azure DI 前產生短效（唯讀）SAS URL
+  - 處理完成後刪除暫存 Blob
+
+@module python-services/extraction/src/ocr/blob_staging
+@since Epic 2 - Story 2.2 (File OCR Extraction Service)
+@lastModified 2026-10-15
+
+@features
+  - 非同步 Blob 上傳（azure.storage.blob.aio）
+  - 短效 SAS URL（預設 2 分鐘，於取得並發名額後才簽發，排隊與重試等待不佔有效時間）
+  - 暫存 Blob 自動清理
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import IO, Optional, Union
+
+import structlog
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobSasPermissions, ContentSettings, generate_blob_sas
+from azure.storage.blob.aio import BlobServiceClient
+
+logger = structlog.get_logger(__name__)
+
+
+class StagedBlobExpiredError(Exception):
+    """SAS URL 於 Azure DI 讀取 Blob 前已過期（重新簽發後可重試）"""
+
+
+class BlobStagingClient:
+    """
+    Blob 暫存客戶端
+
+    將上傳文件暫存至 Azure Blob，並提供 Azure DI 可直接讀取的 SAS URL
+    """
+
+    def __init__(
+        self,
+        connection_string: str,
+        container: str,
+        sas_ttl_seconds: int = 120,
+    ):
+        """
+        初始化客戶端
+
+        Args:
+            connection_string: Azure Storage 連接字串（需包含帳戶金鑰）
+            container: 暫存容器名稱
+            sas_ttl_seconds: SAS URL 有效時間（秒）
+        """
+        self._service = BlobServiceClient.from_connection_string(connection_string)
+        self._container = container
+        self._sas_ttl = timedelta(seconds=sas_ttl_seconds)
+        logger.info(
+            "blob_staging_initialized",
+            account=self._service.account_name,
+            container=container,
+        )
+
+    async def upload(
+        self,
+        document_body: Union[bytes, IO[bytes]],
+        content_type: str,
+        size: Optional[int] = None,
+    ) -> str:
+        """
+        上傳文件
+
+        Args:
+            document_body: 文件二進制數據或二進制檔案物件
+            content_type: MIME 類型
+            size: 文件大小（bytes）
+
+        Returns:
+            Blob 名稱（以 sas_url 取得 Azure DI 可讀取的 URL）
+        """
+        blob_name = uuid.uuid4().hex
+        blob_client = self._service.get_blob_client(self._container, blob_name)
+
+        await blob_client.upload_blob(
+            document_body,
+            length=size,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type),
+        )
+
+        logger.info("blob_staging_uploaded", blob_name=blob_name, size=size)
+        return blob_name
+
+    def sas_url(self, blob_name: str) -> tuple[str, datetime]:
+        """
+        產生唯讀 SAS URL（每次呼叫 Azure DI 前重新簽發）
+
+        Args:
+            blob_name: Blob 名稱
+
+        Returns:
+            tuple: (SAS URL, 到期時間（UTC）)
+        """
+        expires_at = datetime.now(timezone.utc) + self._sas_ttl
+        sas_token = generate_blob_sas(
+            account_name=self._service.account_name,
+            container_name=self._container,
+            blob_name=blob_name,
+            account_key=self._service.credential.account_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=expires_at,
+        )
+        blob_url = self._service.get_blob_client(self._container, blob_name).url
+        return f"{blob_url}?{sas_token}", expires_at
+
+    async def delete(self, blob_name: str) -> None:
+        """
+        刪除暫存 Blob
+
+        Args:
+            blob_name: Blob 名稱
+        """
+        try:
+            await self._service.get_blob_client(self._container, blob_name).delete_blob()
+        except ResourceNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("blob_staging_delete_failed", blob_name=blob_name, error=str(e))
+
+    async def close(self) -> None:
+        """關閉底層連線"""
+        await self._service.close()
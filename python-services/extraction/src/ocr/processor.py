@@ -8,20 +8,37 @@
 
 @module python-services/extraction/src/ocr/processor
 @since Epic 2 - Story 2.2 (File OCR Extraction Service)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 
 @features
   - 統一的文件處理介面
-  - 自動重試機制（指數退避）
+  - 自動重試機制（指數退避，優先遵循 Retry-After）
   - 詳細的錯誤分類
+  - Azure DI 呼叫並發上限與最小呼叫間隔限流
+  - 大型上傳經 Blob SAS URL 交由 Azure DI 直接拉取
+  - 以內容雜湊快取 OCR 結果，重複文件跳過 Azure DI
 """
 
 import asyncio
-from typing import Any, Optional
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import partial
+from typing import IO, Any, Awaitable, Callable, Optional, Union
 from enum import Enum
 import structlog
+from azure.core.exceptions import (
+    HttpResponseError,
+    ServiceRequestError,
+    ServiceRequestTimeoutError,
+    ServiceResponseError,
+    ServiceResponseTimeoutError,
+)
 
 from .azure_di import AzureDocumentIntelligenceClient
+from .blob_staging import BlobStagingClient, StagedBlobExpiredError
+from .result_cache import OcrResultCache
 
 logger = structlog.get_logger(__name__)
 
@@ -38,6 +55,40 @@ class OcrErrorCode(str, Enum):
     UNKNOWN_ERROR = "UNKNOWN_ERROR"
 
 
+# 例外類型 → 錯誤代碼（沿 MRO 查找，子類別優先）
+_EXCEPTION_ERROR_CODES: dict[type, OcrErrorCode] = {
+    asyncio.TimeoutError: OcrErrorCode.TIMEOUT,
+    ServiceRequestTimeoutError: OcrErrorCode.TIMEOUT,
+    ServiceResponseTimeoutError: OcrErrorCode.TIMEOUT,
+    ServiceRequestError: OcrErrorCode.NETWORK_ERROR,
+    ServiceResponseError: OcrErrorCode.NETWORK_ERROR,
+    StagedBlobExpiredError: OcrErrorCode.TIMEOUT,
+}
+
+# Azure DI HTTP 狀態碼 → 錯誤代碼
+_HTTP_STATUS_ERROR_CODES: dict[int, OcrErrorCode] = {
+    400: OcrErrorCode.INVALID_INPUT,
+    408: OcrErrorCode.TIMEOUT,
+    413: OcrErrorCode.FILE_TOO_LARGE,
+    415: OcrErrorCode.UNSUPPORTED_FORMAT,
+    429: OcrErrorCode.SERVICE_ERROR,
+    500: OcrErrorCode.SERVICE_ERROR,
+    502: OcrErrorCode.SERVICE_ERROR,
+    503: OcrErrorCode.SERVICE_ERROR,
+    504: OcrErrorCode.TIMEOUT,
+}
+
+# 不應重試的錯誤代碼
+_NON_RETRYABLE_ERROR_CODES = frozenset({
+    OcrErrorCode.INVALID_INPUT,
+    OcrErrorCode.UNSUPPORTED_FORMAT,
+    OcrErrorCode.FILE_TOO_LARGE,
+})
+
+# 可重試的 HTTP 狀態碼（其餘如 401/403/404 重試也不會成功）
+_RETRYABLE_HTTP_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
 class DocumentProcessor:
     """
     文件處理器
@@ -45,21 +96,27 @@ class DocumentProcessor:
     封裝 OCR 處理邏輯，提供統一的處理介面
     """
 
-    # 支援的 MIME 類型
-    SUPPORTED_MIME_TYPES = {
+    # 支援的 MIME 類型（由呼叫端於入口驗證）
+    SUPPORTED_MIME_TYPES = frozenset({
         "application/pdf",
         "image/jpeg",
         "image/jpg",
         "image/png",
         "image/tiff",
         "image/bmp",
-    }
+    })
 
     def __init__(
         self,
         azure_client: AzureDocumentIntelligenceClient,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        max_concurrency: int = 8,
+        min_interval_ms: int = 100,
+        max_backoff: float = 30.0,
+        blob_staging: Optional[BlobStagingClient] = None,
+        blob_upload_threshold: int = 20 * 1024 * 1024,
+        result_cache: Optional[OcrResultCache] = None,
     ):
         """
         初始化處理器
@@ -68,15 +125,32 @@ class DocumentProcessor:
             azure_client: Azure Document Intelligence 客戶端
             max_retries: 最大重試次數
             retry_delay: 重試延遲（秒）
+            max_concurrency: 同時進行的 Azure DI 呼叫上限
+            min_interval_ms: 相鄰兩次 Azure DI 呼叫的最小間隔（毫秒）
+            max_backoff: 單次重試等待上限（秒）
+            blob_staging: Blob 暫存客戶端（可選，未設定時一律直接上傳 bytes）
+            blob_upload_threshold: 超過此大小（bytes）的上傳改走 Blob SAS URL
+            result_cache: OCR 結果快取（可選）
         """
         self.azure_client = azure_client
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.blob_staging = blob_staging
+        self.blob_upload_threshold = blob_upload_threshold
+        self.result_cache = result_cache
+
+        # Azure DI 限流：並發上限 + 最小呼叫間隔，避免突發請求觸發 429
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._min_interval = max(0, min_interval_ms) / 1000
+        self._last_call_ts = 0.0
+        self._throttle_lock = asyncio.Lock()
 
     async def process_from_url(
         self,
         document_url: str,
         document_id: Optional[str] = None,
+        include_raw: bool = False,
     ) -> dict[str, Any]:
         """
         從 URL 處理文件
@@ -84,6 +158,7 @@ class DocumentProcessor:
         Args:
             document_url: 文件 URL
             document_id: 文件 ID（用於日誌追蹤）
+            include_raw: 是否附帶 Azure DI 原始結果
 
         Returns:
             處理結果字典
@@ -94,50 +169,233 @@ class DocumentProcessor:
             url=document_url[:100] if document_url else None,
         )
 
-        return await self._process_with_retry(
-            self.azure_client.analyze_document_from_url,
-            document_url,
-            document_id=document_id,
+        cache_key = None
+        if self.result_cache is not None:
+            url_key = await self.result_cache.url_key(document_url)
+            if url_key:
+                cache_key = self._cache_variant(f"url:{url_key}", include_raw)
+
+        return await self._with_cache(
+            cache_key,
+            partial(
+                self._process_with_retry,
+                partial(
+                    self.azure_client.analyze_document_from_url,
+                    include_raw=include_raw,
+                ),
+                document_url,
+                document_id=document_id,
+            ),
         )
 
     async def process_from_bytes(
         self,
-        document_bytes: bytes,
+        document_body: Union[bytes, IO[bytes]],
         content_type: str,
         document_id: Optional[str] = None,
+        size: Optional[int] = None,
+        include_raw: bool = False,
     ) -> dict[str, Any]:
         """
-        從 bytes 處理文件
+        從 bytes 或檔案串流處理文件
 
         Args:
-            document_bytes: 文件二進制數據
+            document_body: 文件二進制數據或可 seek 的二進制檔案物件
             content_type: MIME 類型
             document_id: 文件 ID（用於日誌追蹤）
+            size: 文件大小（bytes，僅用於日誌）
+            include_raw: 是否附帶 Azure DI 原始結果
 
         Returns:
             處理結果字典
+
+        Note:
+            content_type 需已由呼叫端依 SUPPORTED_MIME_TYPES 驗證；
+            未驗證的類型會由 Azure DI 以 415 拒絕並歸類為 UNSUPPORTED_FORMAT
         """
-        # 驗證 MIME 類型
-        if content_type not in self.SUPPORTED_MIME_TYPES:
-            return self._create_error_result(
-                OcrErrorCode.UNSUPPORTED_FORMAT,
-                f"Unsupported content type: {content_type}",
-            )
+        if size is None and isinstance(document_body, (bytes, bytearray)):
+            size = len(document_body)
 
         logger.info(
             "process_document_from_bytes",
             document_id=document_id,
             content_type=content_type,
-            size=len(document_bytes),
+            size=size,
+        )
+
+        return await self._with_cache(
+            await self._body_cache_key(document_body, include_raw),
+            partial(
+                self._process_with_retry,
+                partial(
+                    self.azure_client.analyze_document_from_bytes,
+                    include_raw=include_raw,
+                ),
+                document_body,
+                content_type,
+                document_id=document_id,
+            ),
         )
 
-        return await self._process_with_retry(
-            self.azure_client.analyze_document_from_bytes,
-            document_bytes,
+    async def process_from_url_or_upload(
+        self,
+        document_url: Optional[str] = None,
+        document_body: Optional[Union[bytes, IO[bytes]]] = None,
+        content_type: str = "application/pdf",
+        document_id: Optional[str] = None,
+        size: Optional[int] = None,
+        include_raw: bool = False,
+    ) -> dict[str, Any]:
+        """
+        依輸入選擇最省傳輸的處理路徑
+
+        - 有 URL：直接由 Azure DI 拉取
+        - 大型上傳且已設定 Blob 暫存：上傳至 Blob 後以 SAS URL 處理
+        - 其他：直接上傳 bytes
+
+        Args:
+            document_url: 文件 URL（可選）
+            document_body: 文件二進制數據或檔案物件（可選）
+            content_type: MIME 類型
+            document_id: 文件 ID（用於日誌追蹤）
+            size: 文件大小（bytes）
+            include_raw: 是否附帶 Azure DI 原始結果
+
+        Returns:
+            處理結果字典
+        """
+        if document_url:
+            return await self.process_from_url(
+                document_url, document_id=document_id, include_raw=include_raw
+            )
+
+        if document_body is None:
+            return self._create_error_result(
+                OcrErrorCode.INVALID_INPUT,
+                "Either document_url or document_body is required",
+            )
+
+        if size is None and isinstance(document_body, (bytes, bytearray)):
+            size = len(document_body)
+
+        if (
+            self.blob_staging is not None
+            and size is not None
+            and size >= self.blob_upload_threshold
+        ):
+            cache_key = await self._body_cache_key(document_body, include_raw)
+            if cache_key is not None:
+                cached = await self._get_cached(cache_key)
+                if cached is not None:
+                    return cached
+
+            try:
+                blob_name = await self.blob_staging.upload(
+                    document_body, content_type, size
+                )
+            except Exception as e:
+                logger.warning(
+                    "blob_staging_upload_failed",
+                    document_id=document_id,
+                    error=str(e),
+                )
+            else:
+                try:
+                    result = await self._process_with_retry(
+                        partial(self._analyze_staged_blob, include_raw=include_raw),
+                        blob_name,
+                        document_id=document_id,
+                    )
+                    if cache_key is not None and result["success"]:
+                        await self.result_cache.set(cache_key, result)
+                    return result
+                finally:
+                    await self.blob_staging.delete(blob_name)
+
+            # Blob 上傳失敗時退回直接上傳
+            if not isinstance(document_body, (bytes, bytearray)):
+                document_body.seek(0)
+
+        return await self.process_from_bytes(
+            document_body,
             content_type,
             document_id=document_id,
+            size=size,
+            include_raw=include_raw,
         )
 
+    async def _analyze_staged_blob(
+        self, blob_name: str, include_raw: bool = False
+    ) -> dict[str, Any]:
+        """
+        以新簽發的 SAS URL 分析暫存 Blob
+
+        於 _process_with_retry 的並發名額內呼叫，每次嘗試各自簽發 SAS，
+        排隊、限流與退避等待不會消耗其有效時間。
+
+        Raises:
+            StagedBlobExpiredError: SAS 過期導致 Azure DI 無法讀取（400/403，可重試）
+        """
+        sas_url, expires_at = self.blob_staging.sas_url(blob_name)
+        try:
+            return await self.azure_client.analyze_document_from_url(
+                sas_url, include_raw=include_raw
+            )
+        except HttpResponseError as e:
+            if e.status_code in (400, 403) and datetime.now(timezone.utc) >= expires_at:
+                raise StagedBlobExpiredError(str(e)) from e
+            raise
+
+    @staticmethod
+    def _cache_variant(cache_key: str, include_raw: bool) -> str:
+        """含/不含原始結果的回應分開快取"""
+        return f"{cache_key}:raw" if include_raw else cache_key
+
+    async def _body_cache_key(
+        self, document_body: Union[bytes, IO[bytes]], include_raw: bool = False
+    ) -> Optional[str]:
+        """計算文件內容快取鍵（大型檔案於執行緒池中雜湊）"""
+        if self.result_cache is None:
+            return None
+        digest = await asyncio.to_thread(OcrResultCache.hash_body, document_body)
+        return self._cache_variant(f"bytes:{digest}", include_raw)
+
+    async def _get_cached(self, cache_key: str) -> Optional[dict[str, Any]]:
+        """讀取快取結果（命中時重設重試次數）"""
+        cached = await self.result_cache.get(cache_key)
+        if cached is None:
+            return None
+        logger.info("ocr_result_cache_hit", cache_key=cache_key)
+        cached["retryCount"] = 0
+        return cached
+
+    async def _with_cache(
+        self,
+        cache_key: Optional[str],
+        process: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """
+        以快取包裝處理流程
+
+        Args:
+            cache_key: 快取鍵（None 表示不快取）
+            process: 實際執行處理的無參數協程函數
+
+        Returns:
+            處理結果（命中快取或新處理）
+        """
+        if cache_key is None or self.result_cache is None:
+            return await process()
+
+        cached = await self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        result = await process()
+        if result["success"]:
+            await self.result_cache.set(cache_key, result)
+        return result
+
     async def _process_with_retry(
         self,
         process_func,
@@ -161,7 +419,9 @@ class DocumentProcessor:
 
         for attempt in range(self.max_retries):
             try:
-                result = await process_func(*args)
+                async with self._semaphore:
+                    await self._throttle()
+                    result = await process_func(*args)
                 return {
                     "success": True,
                     "errorCode": OcrErrorCode.SUCCESS,
@@ -178,18 +438,18 @@ class DocumentProcessor:
                     attempt=attempt + 1,
                 )
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                    await asyncio.sleep(self._compute_backoff(attempt, e))
 
             except Exception as e:
                 last_error = e
                 error_code = self._classify_error(e)
 
-                # 某些錯誤不應重試
-                if error_code in {
-                    OcrErrorCode.INVALID_INPUT,
-                    OcrErrorCode.UNSUPPORTED_FORMAT,
-                    OcrErrorCode.FILE_TOO_LARGE,
-                }:
+                # 某些錯誤不應重試（立即釋放並發名額）
+                if error_code in _NON_RETRYABLE_ERROR_CODES or (
+                    isinstance(e, HttpResponseError)
+                    and e.status_code is not None
+                    and e.status_code not in _RETRYABLE_HTTP_STATUSES
+                ):
                     logger.error(
                         "process_error_no_retry",
                         document_id=document_id,
@@ -209,7 +469,7 @@ class DocumentProcessor:
                 )
 
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (2**attempt))
+                    await asyncio.sleep(self._compute_backoff(attempt, e))
 
         # 所有重試失敗
         error_code = self._classify_error(last_error)
@@ -225,25 +485,80 @@ class DocumentProcessor:
             self.max_retries,
         )
 
+    def _compute_backoff(self, attempt: int, error: Exception) -> float:
+        """
+        計算重試等待時間
+
+        取指數退避與伺服器 Retry-After 兩者較大值，加上抖動後以 max_backoff 為上限。
+
+        Args:
+            attempt: 目前嘗試次數（從 0 開始）
+            error: 本次失敗的例外
+
+        Returns:
+            等待秒數
+        """
+        backoff = self.retry_delay * (2**attempt)
+        retry_after = self._parse_retry_after(error)
+        delay = max(retry_after, backoff) if retry_after is not None else backoff
+        delay += random.uniform(0, 0.25 * backoff)
+        return min(delay, self.max_backoff)
+
+    @staticmethod
+    def _parse_retry_after(error: Exception) -> Optional[float]:
+        """從 HttpResponseError 的回應標頭解析 Retry-After（秒）"""
+        if not isinstance(error, HttpResponseError) or error.response is None:
+            return None
+
+        headers = error.response.headers
+        for header in ("retry-after-ms", "x-ms-retry-after-ms"):
+            value = headers.get(header)
+            if value:
+                try:
+                    return float(value) / 1000
+                except ValueError:
+                    pass
+
+        value = headers.get("Retry-After")
+        if not value:
+            return None
+
+        # Retry-After 可為秒數或 HTTP-date
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    async def _throttle(self) -> None:
+        """等待至距上一次 Azure DI 呼叫滿足最小間隔"""
+        if self._min_interval <= 0:
+            return
+
+        async with self._throttle_lock:
+            loop = asyncio.get_running_loop()
+            wait = self._min_interval - (loop.time() - self._last_call_ts)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_call_ts = loop.time()
+
     def _classify_error(self, error: Optional[Exception]) -> OcrErrorCode:
-        """分類錯誤類型"""
+        """分類錯誤類型（依例外類型與 HTTP 狀態碼判斷）"""
         if error is None:
             return OcrErrorCode.UNKNOWN_ERROR
 
-        error_str = str(error).lower()
-
-        if "timeout" in error_str:
-            return OcrErrorCode.TIMEOUT
-        if "network" in error_str or "connection" in error_str:
-            return OcrErrorCode.NETWORK_ERROR
-        if "invalid" in error_str or "bad request" in error_str:
-            return OcrErrorCode.INVALID_INPUT
-        if "too large" in error_str or "size" in error_str:
-            return OcrErrorCode.FILE_TOO_LARGE
-        if "unsupported" in error_str or "format" in error_str:
-            return OcrErrorCode.UNSUPPORTED_FORMAT
-        if "service" in error_str or "500" in error_str or "503" in error_str:
-            return OcrErrorCode.SERVICE_ERROR
+        if isinstance(error, HttpResponseError):
+            return _HTTP_STATUS_ERROR_CODES.get(
+                error.status_code, OcrErrorCode.UNKNOWN_ERROR
+            )
+
+        for error_type in type(error).__mro__:
+            error_code = _EXCEPTION_ERROR_CODES.get(error_type)
+            if error_code is not None:
+                return error_code
 
         return OcrErrorCode.UNKNOWN_ERROR
 
@@ -0,0 +1,200 @@
+"""
+@fileoverview OCR 結果快取
+@description
+  以文件內容雜湊為鍵快取 OCR 處理結果，相同文件重複上傳時跳過 Azure DI：
+  - 本機 TTL LRU 快取（cachetools，依筆數與序列化後位元組數雙重限制）
+  - 可選 Redis 後端（設定 REDIS_URL 時啟用，跨 worker 共享）
+  - Bytes / 檔案串流以 blake2b 計算內容雜湊
+  - URL 以（不含 SAS 的路徑, ETag）為鍵，ETag 透過 HEAD 取得
+
+@module python-services/extraction/src/ocr/result_cache
+@since Epic 2 - Story 2.2 (File OCR Extraction Service)
+@lastModified 2026-10-15
+
+@features
+  - 內容定址快取（content-addressed）
+  - 本機 + Redis 兩層快取
+  - 只快取成功結果
+"""
+
+import asyncio
+import hashlib
+import json
+from collections.abc import Mapping
+from datetime import date, time
+from operator import itemgetter
+from typing import IO, Any, Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+from cachetools import TTLCache
+
+logger = structlog.get_logger(__name__)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_REDIS_KEY_PREFIX = "ocr-result:"
+
+
+def _json_default(value: Any) -> Any:
+    """序列化日期與 Azure SDK 模型等非 JSON 原生型別"""
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+class OcrResultCache:
+    """
+    OCR 結果快取
+
+    先查本機快取，未命中再查 Redis（若有設定），命中時回填本機快取
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl_seconds: int = 3600,
+        redis_url: str = "",
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        初始化快取
+
+        Args:
+            maxsize: 本機快取最大筆數
+            ttl_seconds: 快取有效時間（秒）
+            redis_url: Redis 連接字串（可選）
+            max_bytes: 本機快取總大小上限（以序列化後 JSON 位元組數計）
+        """
+        self._ttl = ttl_seconds
+        # 含 rawResult 的結果可達數 MB，僅限筆數不足以控制記憶體：
+        # 以位元組數為容量，每筆至少計 max_bytes / maxsize，同時維持筆數上限
+        self._min_entry_size = max(1, max_bytes // max(1, maxsize))
+        self._local: TTLCache = TTLCache(
+            maxsize=max(max_bytes, self._min_entry_size),
+            ttl=ttl_seconds,
+            getsizeof=itemgetter(1),
+        )
+        self._redis = None
+        self._http = httpx.AsyncClient(timeout=5.0, follow_redirects=False)
+
+        if redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(redis_url)
+
+        logger.info(
+            "ocr_result_cache_initialized",
+            maxsize=maxsize,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+            redis_enabled=self._redis is not None,
+        )
+
+    @staticmethod
+    def hash_body(document_body: Union[bytes, IO[bytes]]) -> str:
+        """
+        計算文件內容雜湊
+
+        檔案物件會分塊讀取，完成後倒回開頭。
+        """
+        if isinstance(document_body, (bytes, bytearray)):
+            return hashlib.blake2b(document_body, digest_size=16).hexdigest()
+
+        digest = hashlib.blake2b(digest_size=16)
+        document_body.seek(0)
+        while chunk := document_body.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        document_body.seek(0)
+        return digest.hexdigest()
+
+    async def url_key(self, document_url: str) -> Optional[str]:
+        """
+        計算 URL 文件的快取鍵
+
+        以 HEAD 取得 ETag，與去除查詢字串（SAS token）的 URL 組成鍵；
+        無法取得 ETag 時不快取。
+
+        Args:
+            document_url: 文件 URL（呼叫端需已完成 SSRF 驗證）
+
+        Returns:
+            快取鍵或 None
+        """
+        try:
+            response = await self._http.head(document_url)
+        except httpx.HTTPError:
+            return None
+
+        etag = response.headers.get("etag")
+        if response.status_code != 200 or not etag:
+            return None
+
+        parts = urlsplit(document_url)
+        source = f"{parts.scheme}://{parts.netloc}{parts.path}|{etag}"
+        return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict[str, Any]]:
+        """
+        讀取快取
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            快取結果（副本）或 None
+        """
+        entry = self._local.get(key)
+        if entry is not None:
+            return dict(entry[0])
+
+        if self._redis is None:
+            return None
+
+        try:
+            raw = await self._redis.get(_REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning("ocr_result_cache_redis_get_failed", error=str(e))
+            return None
+
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        self._set_local(key, value, len(raw))
+        return dict(value)
+
+    async def set(self, key: str, value: dict[str, Any]) -> None:
+        """
+        寫入快取
+
+        Args:
+            key: 快取鍵
+            value: OCR 處理結果
+        """
+        # 大型結果於執行緒池中序列化（同時用於計算大小與寫入 Redis）
+        serialized = await asyncio.to_thread(json.dumps, value, default=_json_default)
+        self._set_local(key, value, len(serialized))
+
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.set(_REDIS_KEY_PREFIX + key, serialized, ex=self._ttl)
+        except Exception as e:
+            logger.warning("ocr_result_cache_redis_set_failed", error=str(e))
+
+    def _set_local(self, key: str, value: dict[str, Any], size: int) -> None:
+        """寫入本機快取（單筆超過總容量時略過本機層）"""
+        try:
+            self._local[key] = (value, max(size, self._min_entry_size))
+        except ValueError:
+            logger.info("ocr_result_cache_local_skipped", size=size)
+
+    async def close(self) -> None:
+        """關閉 HTTP 與 Redis 連線"""
+        await self._http.aclose()
+        if self._redis is not None:
+            await self._redis.aclose()
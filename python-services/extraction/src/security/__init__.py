@@ -1,5 +1,6 @@
-"""SSRF 防護模組（FIX-068）"""
+"""請求安全防護模組（SSRF 防護 FIX-068、上傳大小限制）"""
 
 from .safe_url import SsrfBlockedError, assert_safe_url
+from .upload_limit import UploadSizeLimitMiddleware
 
-__all__ = ["assert_safe_url", "SsrfBlockedError"]
+__all__ = ["assert_safe_url", "SsrfBlockedError", "UploadSizeLimitMiddleware"]
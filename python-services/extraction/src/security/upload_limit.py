@@ -0,0 +1,62 @@
+"""
+@fileoverview 上傳大小限制中介層
+@description
+  在讀取請求 body 之前拒絕超過上限的上傳，避免惡意大檔佔用記憶體/磁碟與 Azure 配額：
+  - Content-Length 超過上限時直接回傳 413（不讀取 body）
+  - 無 Content-Length（chunked）時邊接收邊計數，超過上限即中止
+
+@module python-services/extraction/src/security/upload_limit
+@since Epic 2 - Story 2.2 (File OCR Extraction Service)
+@lastModified 2026-10-15
+"""
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class UploadSizeLimitMiddleware:
+    """
+    上傳大小限制（純 ASGI 中介層）
+
+    FastAPI 會在呼叫端點前先解析 multipart body，端點內的大小檢查為時已晚，
+    因此必須在中介層攔截。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_bytes: int,
+        paths: tuple[str, ...] = ("/extract/file",),
+    ):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = paths
+        self._detail = f"Upload exceeds {max_bytes} bytes"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_bytes:
+                    response = JSONResponse({"detail": self._detail}, status_code=413)
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # 於 body 解析期間拋出，由 FastAPI 轉為 413 回應
+                    raise HTTPException(status_code=413, detail=self._detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
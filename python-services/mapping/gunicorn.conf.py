@@ -0,0 +1,35 @@
+"""
+@fileoverview Gunicorn 設定
+@description
+  Forwarder 識別為純 CPU 工作，單一行程無法利用多核心：
+  - 以 gunicorn 管理多個 UvicornWorker 行程
+  - Worker 數取自 WEB_CONCURRENCY（預設為 CPU 核心數）
+  - uvloop / httptools 由 uvicorn[standard] 提供，UvicornWorker 自動啟用
+  - preload_app：主行程於 fork 前載入模式並建立匹配器（含 Aho-Corasick 自動機），
+    各 worker 以 copy-on-write 共用，不再各自建立
+
+@module python-services/mapping/gunicorn.conf
+@since Epic 2 - Story 2.3 (Forwarder Auto-Identification)
+@lastModified 2026-10-15
+"""
+
+import gc
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8001')}"
+workers = int(os.environ.get("WEB_CONCURRENCY") or os.cpu_count() or 1)
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    """主行程就緒、尚未 fork worker 時建立共用狀態"""
+    import main
+
+    main.init_services()
+
+    # 將既有物件移出 GC 追蹤，避免 worker 的 GC 寫入參考計數而破壞共用分頁
+    gc.freeze()
@@ -14,20 +14,63 @@
   - Logo 文字匹配: +10 分
   - 匹配數量加成: +5 分/額外匹配
 
+  效能：
+  - 正則與小寫字串於建構時預先編譯/轉換，請求路徑不再重複處理
+  - 所有字面字串（名稱/關鍵詞/Logo 文字）以單一 Aho-Corasick 自動機一次掃描
+    （未安裝 pyahocorasick 時退回單一正則交替式的前瞻掃描）
+  - 以文本雜湊為鍵的 LRU 結果快取（重送/重複文件直接命中）
+  - 只比對有字面字串命中的候選模式（僅格式命中無法達到審核閾值）
+  - 所有格式正則以 Hyperscan 資料庫單次預篩（可選；ASCII 文本適用），
+    只有可能命中的格式才交給 Python re 確認
+
 @module python-services/mapping/src/identifier/matcher
 @since Epic 2 - Story 2.3 (Forwarder Auto-Identification)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 """
 
+import hashlib
 import re
-from dataclasses import dataclass, field
-from typing import Optional
+import sys
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+from typing import NamedTuple, Optional
 import structlog
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - 可選依賴
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - 可選依賴
+    hyperscan = None
+
 logger = structlog.get_logger(__name__)
 
+# 正則中的反向參照（\1、(?P=name)）
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?P=")
+
+# 字面字串類別（以小整數編碼，評分迴圈只做整數比較）
+_NAME = 0
+_KEYWORD = 1
+_LOGO_TEXT = 2
+
+# Hyperscan 與 Python re 語意不同的寫法（{,n} 被視為字面、[:alpha:] 被視為 POSIX 類別）
+_HS_UNSAFE_FORMAT_RE = re.compile(r"\{,|\[:")
 
-@dataclass
+# Python 的 \s 涵蓋 \x1c-\x1f，PCRE 不涵蓋；含這些字元的文本不走 Hyperscan 預篩
+_HS_UNSAFE_TEXT_RE = re.compile(r"[\x1c-\x1f]")
+
+# Hyperscan 預篩的最短文本：實測對短文本（約 70 字元以內）中恰好結束於結尾的命中可能漏報
+_HS_MIN_TEXT_LENGTH = 256
+
+# matched_patterns 中各類別的前綴
+_MATCHED_PREFIX = {_NAME: "name", _KEYWORD: "keyword", _LOGO_TEXT: "logo"}
+
+
+@dataclass(slots=True)
 class ForwarderPattern:
     """Forwarder 識別模式配置"""
 
@@ -42,17 +85,71 @@ class ForwarderPattern:
     priority: int = 0
 
 
-@dataclass
-class MatchDetail:
-    """匹配詳細資訊"""
+def _compile_formats_union(
+    compiled_formats: tuple[tuple[str, re.Pattern], ...],
+) -> Optional[re.Pattern]:
+    """
+    合併多個格式正則為單一交替式
+
+    含反向參照（群組編號會位移）或無法合併（如重複具名群組、非開頭的
+    行內旗標）時回傳 None，改為逐一比對。
+    """
+    for fmt, regex in compiled_formats:
+        if regex.groups and _BACKREF_RE.search(fmt):
+            return None
+
+    try:
+        return re.compile(
+            "|".join(f"(?P<_f{i}>{fmt})" for i, (fmt, _) in enumerate(compiled_formats)),
+            re.IGNORECASE,
+        )
+    except re.error:
+        return None
+
+
+def _findall_value(match: re.Match) -> str:
+    """將匹配轉為 re.findall() 第一個元素的字串形式（與既有 matchedValue 一致）"""
+    group_count = match.re.groups
+    if group_count == 0:
+        return match.group(0)
+    if group_count == 1:
+        return match.group(1) or ""
+    return str(tuple(group or "" for group in match.groups()))
+
+
+@dataclass(slots=True)
+class _CompiledPattern:
+    """預先編譯的識別模式（建構時產生，請求路徑唯讀）"""
+
+    pattern: ForwarderPattern
+    # (類別, 小寫, matched_patterns 項目, 預建匹配明細)，依 名稱 → 關鍵詞 → Logo 文字 排列；
+    # 明細：名稱為 (第一個命中, 其後命中)，關鍵詞依命中順位，Logo 文字為單一項
+    needles: tuple[tuple[int, str, str, tuple["MatchDetail", ...]], ...]
+    compiled_formats: tuple[tuple[str, re.Pattern], ...]  # (原始正則, 編譯結果)
+    # 所有格式合併的單一正則（各格式包在 _f{索引} 群組中）；無法合併時為 None
+    formats_union: Optional[re.Pattern] = None
+    # 各格式在 Hyperscan 資料庫中的 ID（-1 表示未納入，需一律比對）；未啟用時為 None
+    format_ids: Optional[tuple[int, ...]] = None
+
+
+class MatchDetail(NamedTuple):
+    """匹配詳細資訊（不可變，僅於輸出時轉為字典）"""
 
     match_type: str  # "name", "keyword", "format", "logo_text"
     pattern: str
-    matched_text: str
     score: float
+    matched_value: Optional[str] = None  # 僅格式匹配
 
+    def to_dict(self) -> dict:
+        """轉換為字典格式"""
+        detail = {"type": self.match_type, "pattern": self.pattern}
+        if self.matched_value is not None:
+            detail["matchedValue"] = self.matched_value
+        detail["score"] = self.score
+        return detail
 
-@dataclass
+
+@dataclass(slots=True)
 class IdentificationResult:
     """識別結果"""
 
@@ -62,11 +159,16 @@ class IdentificationResult:
     confidence: float
     match_method: str
     matched_patterns: list[str]
-    match_details: list[dict]
+    match_details: list[MatchDetail]
     is_identified: bool
+    reason: Optional[str] = None  # 未識別原因
 
     def to_dict(self) -> dict:
         """轉換為字典格式"""
+        if self.reason is not None:
+            match_details = [{"reason": self.reason}]
+        else:
+            match_details = [detail.to_dict() for detail in self.match_details]
         return {
             "forwarderId": self.forwarder_id,
             "forwarderCode": self.forwarder_code,
@@ -74,7 +176,7 @@ class IdentificationResult:
             "confidence": self.confidence,
             "matchMethod": self.match_method,
             "matchedPatterns": self.matched_patterns,
-            "matchDetails": self.match_details,
+            "matchDetails": match_details,
             "isIdentified": self.is_identified,
         }
 
@@ -99,16 +201,339 @@ class ForwarderMatcher:
     THRESHOLD_AUTO_IDENTIFY = 80.0  # >= 80% 自動識別
     THRESHOLD_NEEDS_REVIEW = 50.0  # >= 50% 需要審核
 
-    def __init__(self, patterns: list[ForwarderPattern]):
+    def __init__(self, patterns: list[ForwarderPattern], cache_size: int = 4096):
         """
         初始化匹配器
 
         Args:
             patterns: Forwarder 識別模式列表
+            cache_size: 識別結果快取筆數（0 表示停用）
         """
         # 按優先級排序（高優先級先檢查）
         self._patterns = sorted(patterns, key=lambda p: -p.priority)
-        logger.info("matcher_initialized", pattern_count=len(patterns))
+
+        # 第 n 個命中關鍵詞的分數（累計至上限後為 0），編譯模式時據此預建匹配明細
+        keyword_scores: list[float] = []
+        keyword_score = 0.0
+        for _ in range(max((len(p.keywords) for p in self._patterns), default=0)):
+            score_to_add = min(
+                self.SCORE_KEYWORD_MATCH,
+                self.SCORE_KEYWORD_MAX - keyword_score,
+            )
+            if score_to_add > 0:
+                keyword_score += score_to_add
+            keyword_scores.append(score_to_add)
+        self._keyword_scores = tuple(keyword_scores)
+
+        self._compiled = [
+            self._compile_pattern(pattern)
+            for pattern in self._patterns
+            if pattern.code != "UNKNOWN"
+        ]
+        self._automaton = self._build_automaton(self._compiled)
+        self._literal_re: Optional[re.Pattern] = None
+        self._needle_prefixes: dict[str, tuple[str, ...]] = {}
+        if self._automaton is None:
+            self._literal_re, self._needle_prefixes = self._build_literal_regex(
+                self._compiled
+            )
+
+        # 各位置之後（含）模式可達的最高分，用於提前結束走訪
+        remaining_max = 0.0
+        suffix_max: list[float] = []
+        for compiled in reversed(self._compiled):
+            remaining_max = max(remaining_max, self._max_score(compiled))
+            suffix_max.append(remaining_max)
+        self._remaining_max = tuple(reversed(suffix_max))
+
+        self._format_db = self._build_format_database(self._compiled)
+
+        # 字面字串 → 含該字串的模式索引（候選預篩）；只靠格式最多 20 分，
+        # 未達審核閾值，故無任何字面字串命中的模式不可能成為結果
+        self._literal_prefilter = self.SCORE_FORMAT_MATCH < self.THRESHOLD_NEEDS_REVIEW
+        needle_owners: dict[str, list[int]] = {}
+        for index, compiled in enumerate(self._compiled):
+            for _, needle, _, _ in compiled.needles:
+                owners = needle_owners.setdefault(needle, [])
+                if not owners or owners[-1] != index:
+                    owners.append(index)
+        self._needle_owners: dict[str, tuple[int, ...]] = {
+            needle: tuple(owners) for needle, owners in needle_owners.items()
+        }
+
+        self._cache_size = cache_size
+        self._cache: OrderedDict[bytes, IdentificationResult] = OrderedDict()
+        logger.info(
+            "matcher_initialized",
+            pattern_count=len(patterns),
+            aho_corasick=self._automaton is not None,
+            hyperscan=self._format_db is not None,
+        )
+
+    @staticmethod
+    def _build_automaton(compiled_patterns: list[_CompiledPattern]):
+        """
+        以所有字面字串建立 Aho-Corasick 自動機
+
+        Args:
+            compiled_patterns: 預先編譯的模式列表
+
+        Returns:
+            自動機；未安裝 pyahocorasick 或沒有任何字面字串時為 None
+        """
+        if ahocorasick is None:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for compiled in compiled_patterns:
+            for _, needle, _, _ in compiled.needles:
+                # 空字串無法加入自動機，於掃描結果中固定視為命中
+                if needle:
+                    automaton.add_word(needle, needle)
+
+        if len(automaton) == 0:
+            return None
+
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _build_literal_regex(
+        compiled_patterns: list[_CompiledPattern],
+    ) -> tuple[Optional[re.Pattern], dict[str, tuple[str, ...]]]:
+        """
+        以所有字面字串建立單一正則交替式（無 pyahocorasick 時的掃描器）
+
+        交替式包在前瞻 `(?=(...))` 中，每個起始位置都會嘗試匹配，
+        因此重疊的字串（如 "dhl" 與 "dhl express"）不會互相吞掉；
+        字串依長度遞減排列，同一位置取得最長命中，
+        較短的命中必為其前綴，由前綴對照表一併補回。
+
+        Args:
+            compiled_patterns: 預先編譯的模式列表
+
+        Returns:
+            tuple: (正則；沒有任何字面字串時為 None, 命中字串 → 同位置亦命中的字串)
+        """
+        needles = {
+            needle
+            for compiled in compiled_patterns
+            for _, needle, _, _ in compiled.needles
+            if needle
+        }
+        if not needles:
+            return None, {}
+
+        ordered = sorted(needles, key=len, reverse=True)
+        literal_re = re.compile(
+            "(?=(" + "|".join(re.escape(needle) for needle in ordered) + "))"
+        )
+        needle_prefixes = {
+            needle: tuple(other for other in ordered if needle.startswith(other))
+            for needle in ordered
+        }
+        return literal_re, needle_prefixes
+
+    @staticmethod
+    def _build_format_database(compiled_patterns: list[_CompiledPattern]):
+        """
+        以所有格式正則建立 Hyperscan 預篩資料庫
+
+        以 PREFILTER 模式編譯（只會多報、不會漏報），命中後仍由 Python re
+        確認並取得匹配值；Hyperscan 無法編譯或語意可能不同的格式不納入，
+        於每次請求一律比對。同時填入各模式的 format_ids。
+
+        Args:
+            compiled_patterns: 預先編譯的模式列表
+
+        Returns:
+            Hyperscan 資料庫；未安裝 hyperscan 或沒有可納入的格式時為 None
+        """
+        if hyperscan is None:
+            return None
+
+        flags = (
+            hyperscan.HS_FLAG_CASELESS
+            | hyperscan.HS_FLAG_PREFILTER
+            | hyperscan.HS_FLAG_SINGLEMATCH
+            | hyperscan.HS_FLAG_ALLOWEMPTY
+        )
+        expressions: list[bytes] = []
+        for compiled in compiled_patterns:
+            format_ids: list[int] = []
+            for fmt, _ in compiled.compiled_formats:
+                format_id = -1
+                if fmt.isascii() and not _HS_UNSAFE_FORMAT_RE.search(fmt):
+                    expression = fmt.encode("ascii")
+                    try:
+                        hyperscan.Database().compile(
+                            expressions=[expression], ids=[0], elements=1, flags=flags
+                        )
+                    except hyperscan.error:
+                        pass
+                    else:
+                        format_id = len(expressions)
+                        expressions.append(expression)
+                format_ids.append(format_id)
+            compiled.format_ids = tuple(format_ids)
+
+        if not expressions:
+            for compiled in compiled_patterns:
+                compiled.format_ids = None
+            return None
+
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions),
+        )
+        return database
+
+    def _scan_formats(self, original_text: str) -> Optional[set[int]]:
+        """
+        一次掃描找出可能命中的格式
+
+        僅處理夠長的 ASCII 文本（Python re 的 IGNORECASE 與 \\w/\\d 等在非 ASCII
+        文本上採 Unicode 語意，與 Hyperscan 不同）。
+
+        Args:
+            original_text: 原始文本
+
+        Returns:
+            可能命中的格式 ID 集合；無法預篩時為 None（退回逐模式比對）
+        """
+        if (
+            self._format_db is None
+            or len(original_text) < _HS_MIN_TEXT_LENGTH
+            or not original_text.isascii()
+            or _HS_UNSAFE_TEXT_RE.search(original_text)
+        ):
+            return None
+
+        hits: set[int] = set()
+
+        def on_match(format_id, start, end, flags, context):
+            hits.add(format_id)
+
+        self._format_db.scan(original_text.encode("ascii"), match_event_handler=on_match)
+        return hits
+
+    def _scan_literals(self, normalized_text: str) -> set[str]:
+        """
+        一次掃描找出文本中出現的所有字面字串
+
+        Args:
+            normalized_text: 標準化文本
+
+        Returns:
+            命中字串集合（空字串固定視為命中）
+        """
+        hits = {""}
+        if self._automaton is not None:
+            hits.update(needle for _, needle in self._automaton.iter(normalized_text))
+        elif self._literal_re is not None:
+            needle_prefixes = self._needle_prefixes
+            for match in self._literal_re.finditer(normalized_text):
+                hits.update(needle_prefixes[match.group(1)])
+        return hits
+
+    def _candidate_indices(self, literal_hits: set[str]) -> Iterable[int]:
+        """
+        由字面字串命中推出候選模式（依優先級順序）
+
+        Args:
+            literal_hits: 命中字串集合
+
+        Returns:
+            候選模式在 self._compiled 中的索引
+        """
+        if not self._literal_prefilter:
+            return range(len(self._compiled))
+
+        candidates: set[int] = set()
+        for needle in literal_hits:
+            owners = self._needle_owners.get(needle)
+            if owners is not None:
+                candidates.update(owners)
+        return sorted(candidates)
+
+    def _needle_details(
+        self, category: int, needle: str, keyword_scores: tuple[float, ...]
+    ) -> tuple[MatchDetail, ...]:
+        """
+        預建單個字面字串命中時的匹配明細
+
+        Args:
+            category: 字面字串類別
+            needle: 原始字串
+            keyword_scores: 此模式各命中順位的關鍵詞分數
+
+        Returns:
+            名稱：(第一個命中, 其後命中)；關鍵詞：依命中順位；Logo 文字：單一項
+        """
+        if category == _NAME:
+            return (
+                MatchDetail("name", needle, self.SCORE_NAME_MATCH),
+                MatchDetail("name", needle, self.SCORE_BONUS_PER_MATCH),
+            )
+        if category == _KEYWORD:
+            return tuple(MatchDetail("keyword", needle, score) for score in keyword_scores)
+        return (MatchDetail("logo_text", needle, self.SCORE_LOGO_TEXT_MATCH),)
+
+    def _compile_pattern(self, pattern: ForwarderPattern) -> _CompiledPattern:
+        """
+        預先編譯單個 Forwarder 模式
+
+        無效的正則於此記錄並略過，不再於每次請求時重試編譯。
+
+        Args:
+            pattern: Forwarder 識別模式
+
+        Returns:
+            預先編譯的模式
+        """
+        compiled_formats: list[tuple[str, re.Pattern]] = []
+        for fmt in pattern.formats:
+            try:
+                compiled_formats.append((fmt, re.compile(fmt, re.IGNORECASE)))
+            except re.error as e:
+                logger.warning(
+                    "invalid_regex_pattern",
+                    pattern=fmt,
+                    forwarder_code=pattern.code,
+                    error=str(e),
+                )
+
+        formats_union = None
+        if len(compiled_formats) > 1:
+            formats_union = _compile_formats_union(compiled_formats)
+
+        # 建構後唯讀：以 tuple 保存，字串 intern（各模式共用的字串為同一物件）；
+        # MatchDetail 不可變，命中時直接取用預建明細，不再逐次配置
+        keyword_scores = self._keyword_scores[: len(pattern.keywords)]
+        needles = tuple(
+            (
+                category,
+                sys.intern(needle.lower()),
+                sys.intern(f"{_MATCHED_PREFIX[category]}:{needle}"),
+                self._needle_details(category, needle, keyword_scores),
+            )
+            for category, values in (
+                (_NAME, pattern.names),
+                (_KEYWORD, pattern.keywords),
+                (_LOGO_TEXT, pattern.logo_text),
+            )
+            for needle in values
+        )
+
+        return _CompiledPattern(
+            pattern=pattern,
+            needles=needles,
+            compiled_formats=tuple(compiled_formats),
+            formats_union=formats_union,
+        )
 
     def identify(self, text: str) -> IdentificationResult:
         """
@@ -123,20 +548,70 @@ class ForwarderMatcher:
         if not text or not text.strip():
             return self._create_unidentified_result("empty_text")
 
+        if self._cache_size <= 0:
+            return self._identify(text)
+
+        # 以原始文本雜湊為鍵（格式匹配作用於原始文本）
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return self._copy_result(cached)
+
+        result = self._identify(text)
+        self._cache[key] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return self._copy_result(result)
+
+    def clear_cache(self) -> None:
+        """清除識別結果快取（模式變更時呼叫）"""
+        self._cache.clear()
+
+    @staticmethod
+    def _copy_result(result: IdentificationResult) -> IdentificationResult:
+        """複製結果的可變欄位，避免呼叫端修改污染快取"""
+        return replace(
+            result,
+            matched_patterns=list(result.matched_patterns),
+            match_details=list(result.match_details),
+        )
+
+    def _identify(self, text: str) -> IdentificationResult:
+        """
+        執行識別（不經快取）
+
+        Args:
+            text: OCR 提取的文本內容（非空）
+
+        Returns:
+            識別結果
+        """
         # 預處理文本
         normalized_text = self._normalize_text(text)
 
         best_result: Optional[IdentificationResult] = None
         best_confidence = 0.0
 
-        # 對每個 Forwarder 模式進行匹配
-        for pattern in self._patterns:
-            if pattern.code == "UNKNOWN":
-                continue
+        # 單次掃描所有字面字串
+        literal_hits = self._scan_literals(normalized_text)
+
+        # 有候選模式時，再單次掃描所有格式
+        candidates = self._candidate_indices(literal_hits)
+        format_hits = self._scan_formats(text) if candidates else None
 
-            result = self._match_pattern(pattern, normalized_text, text)
+        # 對有字面字串命中的 Forwarder 模式進行匹配
+        for index in candidates:
+            # 剩餘模式皆無法嚴格超越目前最佳結果時提前結束（含已達 100 分）
+            if best_confidence >= self._remaining_max[index]:
+                break
 
-            if result.confidence > best_confidence:
+            compiled = self._compiled[index]
+            result = self._match_pattern(
+                compiled, literal_hits, text, format_hits, best_confidence
+            )
+
+            if result is not None and result.confidence > best_confidence:
                 best_confidence = result.confidence
                 best_result = result
 
@@ -163,116 +638,103 @@ class ForwarderMatcher:
         Returns:
             標準化後的文本（小寫，移除多餘空白）
         """
-        # 轉小寫
-        normalized = text.lower()
-        # 移除多餘空白
-        normalized = re.sub(r"\s+", " ", normalized)
-        return normalized.strip()
+        # 轉小寫並移除多餘空白（str.split() 的空白定義與 re 的 \s 相同）
+        return " ".join(text.lower().split())
 
     def _match_pattern(
-        self, pattern: ForwarderPattern, normalized_text: str, original_text: str
-    ) -> IdentificationResult:
+        self,
+        compiled: _CompiledPattern,
+        literal_hits: set[str],
+        original_text: str,
+        format_hits: Optional[set[int]] = None,
+        best_confidence: Optional[float] = None,
+    ) -> Optional[IdentificationResult]:
         """
         對單個 Forwarder 模式進行匹配
 
         Args:
-            pattern: Forwarder 識別模式
-            normalized_text: 標準化文本
+            compiled: 預先編譯的 Forwarder 識別模式
+            literal_hits: 文本中出現的字面字串（見 _scan_literals）
             original_text: 原始文本（用於格式匹配）
+            format_hits: 可能命中的格式 ID（見 _scan_formats）
+            best_confidence: 目前最佳信心度；提供時，無法嚴格超越它或
+                無法達到審核閾值的模式不做格式匹配，直接回傳 None
 
         Returns:
-            匹配結果
+            匹配結果或 None
         """
+        pattern = compiled.pattern
         total_score = 0.0
         matched_patterns: list[str] = []
-        match_details: list[dict] = []
+        match_details: list[MatchDetail] = []
         primary_method = "none"
 
-        # 1. 名稱匹配
-        name_matched = False
-        for name in pattern.names:
-            name_lower = name.lower()
-            if name_lower in normalized_text:
-                if not name_matched:
-                    total_score += self.SCORE_NAME_MATCH
-                    primary_method = "name"
-                    name_matched = True
-                matched_patterns.append(f"name:{name}")
-                match_details.append(
-                    {
-                        "type": "name",
-                        "pattern": name,
-                        "score": self.SCORE_NAME_MATCH if len(match_details) == 0 else self.SCORE_BONUS_PER_MATCH,
-                    }
-                )
+        # 1./2. 名稱與關鍵詞匹配（單次走訪所有字面字串；Logo 文字先記下，
+        #       於格式匹配後計分，維持 名稱 → 關鍵詞 → 格式 → Logo 的優先順序）
+        keyword_rank = 0
+        logo_key: Optional[str] = None
+        logo_detail: Optional[MatchDetail] = None
+        for category, needle_lower, matched_key, details in compiled.needles:
+            if needle_lower not in literal_hits:
+                continue
 
-        # 2. 關鍵詞匹配
-        keyword_score = 0.0
-        for keyword in pattern.keywords:
-            keyword_lower = keyword.lower()
-            if keyword_lower in normalized_text:
-                score_to_add = min(
-                    self.SCORE_KEYWORD_MATCH,
-                    self.SCORE_KEYWORD_MAX - keyword_score,
-                )
-                if score_to_add > 0:
-                    keyword_score += score_to_add
-                    total_score += score_to_add
+            if category == _NAME:
+                # 名稱皆排在最前面：尚無明細即為第一個命中的名稱
+                if not match_details:
+                    detail = details[0]
+                    total_score += detail.score
+                    primary_method = "name"
+                else:
+                    detail = details[1]
+                matched_patterns.append(matched_key)
+                match_details.append(detail)
+            elif category == _KEYWORD:
+                detail = details[keyword_rank]
+                keyword_rank += 1
+                if detail.score > 0:
+                    total_score += detail.score
                     if primary_method == "none":
                         primary_method = "keyword"
-                matched_patterns.append(f"keyword:{keyword}")
-                match_details.append(
-                    {
-                        "type": "keyword",
-                        "pattern": keyword,
-                        "score": score_to_add,
-                    }
-                )
-
-        # 3. 格式匹配（使用正則表達式）
-        for fmt in pattern.formats:
-            try:
-                regex = re.compile(fmt, re.IGNORECASE)
-                matches = regex.findall(original_text)
-                if matches:
-                    total_score += self.SCORE_FORMAT_MATCH
-                    if primary_method == "none":
-                        primary_method = "format"
-                    # 只記錄第一個匹配
-                    matched_patterns.append(f"format:{fmt}")
-                    match_details.append(
-                        {
-                            "type": "format",
-                            "pattern": fmt,
-                            "matchedValue": matches[0] if isinstance(matches[0], str) else str(matches[0]),
-                            "score": self.SCORE_FORMAT_MATCH,
-                        }
-                    )
-                    break  # 只計算一次格式匹配分數
-            except re.error as e:
-                logger.warning(
-                    "invalid_regex_pattern",
-                    pattern=fmt,
-                    forwarder_code=pattern.code,
-                    error=str(e),
-                )
+                matched_patterns.append(matched_key)
+                match_details.append(detail)
+            elif logo_detail is None:
+                # 只計算第一個 Logo 文字
+                logo_key = matched_key
+                logo_detail = details[0]
+
+        # 字面字串分數已定，格式比對前先確認本模式是否仍可能勝出
+        if best_confidence is not None:
+            upper_bound = total_score
+            if compiled.compiled_formats:
+                upper_bound += self.SCORE_FORMAT_MATCH
+            if logo_detail is not None:
+                upper_bound += logo_detail.score
+            upper_bound = min(upper_bound, 100.0)
+            if (
+                upper_bound <= best_confidence
+                or upper_bound < self.THRESHOLD_NEEDS_REVIEW
+            ):
+                return None
+
+        # 3. 格式匹配（只計算第一個命中的格式）
+        format_match = self._match_formats(compiled, original_text, format_hits)
+        if format_match is not None:
+            fmt, matched_value = format_match
+            total_score += self.SCORE_FORMAT_MATCH
+            if primary_method == "none":
+                primary_method = "format"
+            matched_patterns.append(f"format:{fmt}")
+            match_details.append(
+                MatchDetail("format", fmt, self.SCORE_FORMAT_MATCH, matched_value)
+            )
 
         # 4. Logo 文字匹配
-        for logo_text in pattern.logo_text:
-            logo_text_lower = logo_text.lower()
-            if logo_text_lower in normalized_text:
-                total_score += self.SCORE_LOGO_TEXT_MATCH
-                if primary_method == "none":
-                    primary_method = "logo_text"
-                matched_patterns.append(f"logo:{logo_text}")
-                match_details.append(
-                    {
-                        "type": "logo_text",
-                        "pattern": logo_text,
-                        "score": self.SCORE_LOGO_TEXT_MATCH,
-                    }
-                )
-                break  # 只計算一次 Logo 文字匹配分數
+        if logo_detail is not None:
+            total_score += logo_detail.score
+            if primary_method == "none":
+                primary_method = "logo_text"
+            matched_patterns.append(logo_key)
+            match_details.append(logo_detail)
 
         # 計算最終信心度（最高 100%）
         confidence = min(total_score, 100.0)
@@ -288,6 +750,63 @@ class ForwarderMatcher:
             is_identified=confidence >= self.THRESHOLD_AUTO_IDENTIFY,
         )
 
+    def _max_score(self, compiled: _CompiledPattern) -> float:
+        """計算單個模式可達的最高信心度（名稱 + 關鍵詞上限 + 格式 + Logo）"""
+        pattern = compiled.pattern
+        score = 0.0
+        if pattern.names:
+            score += self.SCORE_NAME_MATCH
+        score += min(
+            self.SCORE_KEYWORD_MATCH * len(pattern.keywords), self.SCORE_KEYWORD_MAX
+        )
+        if compiled.compiled_formats:
+            score += self.SCORE_FORMAT_MATCH
+        if pattern.logo_text:
+            score += self.SCORE_LOGO_TEXT_MATCH
+        return min(score, 100.0)
+
+    @staticmethod
+    def _match_formats(
+        compiled: _CompiledPattern,
+        original_text: str,
+        format_hits: Optional[set[int]] = None,
+    ) -> Optional[tuple[str, str]]:
+        """
+        依格式列表順序找出第一個命中的格式
+
+        有合併正則時先單次掃描：未命中即可略過所有格式；命中時回報的是
+        最左側位置的格式，列表中排在其前的格式仍可能命中較後位置，需逐一確認。
+
+        有 Hyperscan 預篩結果時，只比對可能命中（或未納入預篩）的格式。
+
+        Args:
+            compiled: 預先編譯的 Forwarder 識別模式
+            original_text: 原始文本
+            format_hits: 可能命中的格式 ID（None 表示未預篩）
+
+        Returns:
+            tuple: (格式正則, 第一個匹配值) 或 None
+        """
+        formats = compiled.compiled_formats
+        if format_hits is not None and compiled.format_ids is not None:
+            formats = [
+                compiled_format
+                for compiled_format, format_id in zip(formats, compiled.format_ids)
+                if format_id < 0 or format_id in format_hits
+            ]
+        elif compiled.formats_union is not None:
+            union_match = compiled.formats_union.search(original_text)
+            if union_match is None:
+                return None
+            formats = formats[: int(union_match.lastgroup[2:]) + 1]
+
+        for fmt, regex in formats:
+            match = regex.search(original_text)
+            if match is not None:
+                return fmt, _findall_value(match)
+
+        return None
+
     def _create_unidentified_result(self, reason: str) -> IdentificationResult:
         """
         創建未識別結果
@@ -305,6 +824,7 @@ class ForwarderMatcher:
             confidence=0.0,
             match_method="none",
             matched_patterns=[],
-            match_details=[{"reason": reason}],
+            match_details=[],
             is_identified=False,
+            reason=reason,
         )
@@ -3,7 +3,9 @@
 @description
   提供 Forwarder 識別和欄位映射的 RESTful API：
   - POST /identify - 從 OCR 文本識別 Forwarder
+  - POST /identify/batch - 批次識別多份文本
   - POST /map-fields - 從 OCR 文本提取欄位值
+  - POST /map-fields/batch - 批次映射多份文件
   - GET /forwarders - 獲取所有 Forwarder 列表
   - GET /health - 健康檢查
 
@@ -19,7 +21,7 @@
 
 @module python-services/mapping/src/main
 @since Epic 2 - Story 2.3 (Forwarder Auto-Identification)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 
 @features
   - FastAPI 異步 HTTP 服務
@@ -31,6 +33,7 @@
   - 健康檢查端點
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from typing import Optional
@@ -47,6 +50,8 @@ from mapper import (
     FieldMapper,
     MapFieldsRequest,
     MapFieldsResponse,
+    MapFieldsBatchRequest,
+    MapFieldsBatchResponse,
     FieldMappingResult,
     ExtractionStatistics,
     UnmappedFieldDetail,
@@ -65,6 +70,11 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0", alias="HOST")
     port: int = Field(default=8001, alias="PORT")
     debug: bool = Field(default=False, alias="DEBUG")
+    workers: int = Field(
+        default=os.cpu_count() or 1,
+        alias="WEB_CONCURRENCY",
+        description="uvicorn worker 數（DEBUG 模式固定為 1）",
+    )
 
     # CORS
     cors_origins: str = Field(
@@ -73,6 +83,13 @@ class Settings(BaseSettings):
         description="允許的 CORS 來源（逗號分隔）",
     )
 
+    # Field mapping
+    field_mapping_cache_size: int = Field(
+        default=0,
+        alias="FIELD_MAPPING_CACHE_SIZE",
+        description="欄位映射結果快取筆數（0 表示停用；僅重複處理相同文件時有益）",
+    )
+
     # Database (for loading forwarder patterns)
     database_url: str = Field(
         default="",
@@ -139,6 +156,23 @@ class IdentifyResponse(BaseModel):
     status: str  # "IDENTIFIED", "NEEDS_REVIEW", "UNIDENTIFIED"
 
 
+class IdentifyBatchRequest(BaseModel):
+    """批次識別請求"""
+    items: list[IdentifyRequest] = Field(
+        ...,
+        description="待識別的文本列表",
+        min_length=1,
+        max_length=500,
+    )
+
+
+class IdentifyBatchResponse(BaseModel):
+    """批次識別響應（results 與請求 items 順序一致）"""
+    success: bool
+    results: list[IdentifyResponse]
+    total: int
+
+
 class ForwarderInfo(BaseModel):
     """Forwarder 資訊"""
     id: str
@@ -246,6 +280,8 @@ DEFAULT_FORWARDER_PATTERNS: list[ForwarderPattern] = [
 matcher: Optional[ForwarderMatcher] = None
 field_mapper: Optional[FieldMapper] = None
 forwarder_list: list[ForwarderInfo] = []
+forwarders_response: Optional[ForwardersResponse] = None
+health_response: Optional[HealthResponse] = None
 
 
 def load_patterns_from_db() -> list[ForwarderPattern]:
@@ -260,43 +296,35 @@ def load_patterns_from_db() -> list[ForwarderPattern]:
         return DEFAULT_FORWARDER_PATTERNS
 
     try:
+        from contextlib import closing
+
         import psycopg2
-        import json
-
-        conn = psycopg2.connect(settings.database_url)
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT id, code, name, display_name, identification_patterns, priority
-            FROM forwarders
-            WHERE is_active = true
-            ORDER BY priority DESC
-        """)
-
-        patterns: list[ForwarderPattern] = []
-        for row in cur.fetchall():
-            forwarder_id, code, name, display_name, patterns_json, priority = row
-
-            # 解析 JSON 模式
-            if isinstance(patterns_json, str):
-                patterns_data = json.loads(patterns_json)
-            else:
-                patterns_data = patterns_json
-
-            patterns.append(ForwarderPattern(
-                forwarder_id=forwarder_id,
-                code=code,
-                name=name,
-                display_name=display_name,
-                names=patterns_data.get("names", []),
-                keywords=patterns_data.get("keywords", []),
-                formats=patterns_data.get("formats", []),
-                logo_text=patterns_data.get("logoText", []),
-                priority=priority or 0,
-            ))
-
-        cur.close()
-        conn.close()
+        from psycopg2.extras import RealDictCursor
+
+        with closing(psycopg2.connect(settings.database_url)) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT id, code, name, display_name, identification_patterns, priority
+                    FROM forwarders
+                    WHERE is_active = true
+                    ORDER BY priority DESC
+                """)
+
+                patterns: list[ForwarderPattern] = []
+                for row in cur:
+                    # identification_patterns 為 jsonb，psycopg2 直接解碼為 dict
+                    patterns_data = row["identification_patterns"]
+                    patterns.append(ForwarderPattern(
+                        forwarder_id=row["id"],
+                        code=row["code"],
+                        name=row["name"],
+                        display_name=row["display_name"],
+                        names=patterns_data.get("names", []),
+                        keywords=patterns_data.get("keywords", []),
+                        formats=patterns_data.get("formats", []),
+                        logo_text=patterns_data.get("logoText", []),
+                        priority=row["priority"] or 0,
+                    ))
 
         logger.info("patterns_loaded_from_db", count=len(patterns))
         return patterns
@@ -306,12 +334,14 @@ def load_patterns_from_db() -> list[ForwarderPattern]:
         return DEFAULT_FORWARDER_PATTERNS
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """應用程式生命週期管理"""
-    global matcher, field_mapper, forwarder_list
+def init_services() -> None:
+    """
+    載入 Forwarder 模式並建立匹配器與欄位映射器
 
-    logger.info("application_startup")
+    gunicorn 以 preload_app 啟動時由主行程於 fork 前呼叫（見 gunicorn.conf.py），
+    各 worker 以 copy-on-write 共用已建立的模式與自動機；否則於 lifespan 中呼叫。
+    """
+    global matcher, field_mapper, forwarder_list, forwarders_response, health_response
 
     # 載入 Forwarder 模式
     patterns = load_patterns_from_db()
@@ -330,12 +360,35 @@ async def lifespan(app: FastAPI):
         if p.code != "UNKNOWN"
     ]
 
+    # 列表於啟動後不變，回應只需建立一次
+    forwarders_response = ForwardersResponse(
+        success=True,
+        forwarders=forwarder_list,
+        total=len(forwarder_list),
+    )
+    health_response = HealthResponse(
+        status="healthy",
+        service="forwarder-mapping",
+        version="1.0.0",
+        forwarderCount=len(forwarder_list),
+    )
+
     logger.info("matcher_ready", forwarder_count=len(forwarder_list))
 
     # 初始化欄位映射器
-    field_mapper = FieldMapper()
+    field_mapper = FieldMapper(cache_size=settings.field_mapping_cache_size)
     logger.info("field_mapper_ready")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """應用程式生命週期管理"""
+    logger.info("application_startup")
+
+    # 已於 fork 前建立時直接沿用
+    if matcher is None:
+        init_services()
+
     yield
 
     logger.info("application_shutdown")
@@ -365,47 +418,25 @@ app.add_middleware(
 @app.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
     """健康檢查端點"""
-    return HealthResponse(
-        status="healthy",
-        service="forwarder-mapping",
-        version="1.0.0",
-        forwarderCount=len(forwarder_list),
-    )
+    return health_response
 
 
 @app.get("/forwarders", response_model=ForwardersResponse)
 async def get_forwarders() -> ForwardersResponse:
     """獲取所有 Forwarder 列表"""
-    return ForwardersResponse(
-        success=True,
-        forwarders=forwarder_list,
-        total=len(forwarder_list),
-    )
+    return forwarders_response
 
 
-@app.post("/identify", response_model=IdentifyResponse)
-async def identify_forwarder(request: IdentifyRequest) -> IdentifyResponse:
+def _identify_one(request: IdentifyRequest) -> IdentifyResponse:
     """
-    從 OCR 文本識別 Forwarder
+    識別單份文本並組成響應
 
     Args:
         request: 包含 OCR 文本的請求
 
     Returns:
-        識別結果，包含信心度和匹配詳情
+        識別響應
     """
-    if matcher is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Matcher not initialized",
-        )
-
-    logger.info(
-        "identify_request",
-        document_id=request.documentId,
-        text_length=len(request.text),
-    )
-
     # 執行識別
     result = matcher.identify(request.text)
 
@@ -428,42 +459,87 @@ async def identify_forwarder(request: IdentifyRequest) -> IdentifyResponse:
         status=status,
     )
 
-    return IdentifyResponse(
+    # to_dict() 由匹配器產生，結構可信，略過逐欄位驗證
+    return IdentifyResponse.model_construct(
         success=True,
         documentId=request.documentId,
-        forwarderId=result.forwarder_id,
-        forwarderCode=result.forwarder_code,
-        forwarderName=result.forwarder_name,
-        confidence=result.confidence,
-        matchMethod=result.match_method,
-        matchedPatterns=result.matched_patterns,
-        matchDetails=result.match_details,
-        isIdentified=result.is_identified,
+        **result.to_dict(),
         needsReview=needs_review,
         status=status,
     )
 
 
-@app.post("/map-fields", response_model=MapFieldsResponse)
-async def map_fields(request: MapFieldsRequest) -> MapFieldsResponse:
+@app.post("/identify", response_model=IdentifyResponse)
+async def identify_forwarder(request: IdentifyRequest) -> IdentifyResponse:
     """
-    從 OCR 文本提取欄位值
+    從 OCR 文本識別 Forwarder
 
-    使用三層映射架構（Tier 1/2/3）從 OCR 文本中提取發票欄位值。
-    支援多種提取方法：regex, keyword, position, azure_field。
+    Args:
+        request: 包含 OCR 文本的請求
+
+    Returns:
+        識別結果，包含信心度和匹配詳情
+    """
+    if matcher is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Matcher not initialized",
+        )
+
+    logger.info(
+        "identify_request",
+        document_id=request.documentId,
+        text_length=len(request.text),
+    )
+
+    return _identify_one(request)
+
+
+@app.post("/identify/batch", response_model=IdentifyBatchResponse)
+async def identify_forwarder_batch(request: IdentifyBatchRequest) -> IdentifyBatchResponse:
+    """
+    批次識別 Forwarder（用於大量重新處理）
+
+    單次請求處理多份文本，共用同一匹配器；重複文本直接命中結果快取。
 
     Args:
-        request: 包含 OCR 文本和映射規則的請求
+        request: 包含多份 OCR 文本的請求
 
     Returns:
-        欄位映射結果，包含每個欄位的值、信心度和來源
+        各文本的識別結果（順序與請求一致）
     """
-    if field_mapper is None:
+    if matcher is None:
         raise HTTPException(
             status_code=503,
-            detail="Field mapper not initialized",
+            detail="Matcher not initialized",
         )
 
+    logger.info("identify_batch_request", item_count=len(request.items))
+
+    results = []
+    for item in request.items:
+        results.append(_identify_one(item))
+        # 逐份讓出事件迴圈，大型批次不會阻塞 /health 與其他請求
+        # （不改用執行緒池：匹配器的結果快取與 Hyperscan 資料庫非執行緒安全）
+        await asyncio.sleep(0)
+
+    return IdentifyBatchResponse.model_construct(
+        success=True,
+        results=results,
+        total=len(results),
+    )
+
+
+def _map_fields_one(request: MapFieldsRequest) -> MapFieldsResponse:
+    """
+    映射單一文件的欄位（/map-fields 與 /map-fields/batch 共用）
+
+    Args:
+        request: 包含 OCR 文本和映射規則的請求
+
+    Returns:
+        欄位映射結果；映射失敗時 success 為 False
+    """
     logger.info(
         "map_fields_request",
         document_id=request.document_id,
@@ -524,6 +600,65 @@ async def map_fields(request: MapFieldsRequest) -> MapFieldsResponse:
         )
 
 
+@app.post("/map-fields", response_model=MapFieldsResponse)
+async def map_fields(request: MapFieldsRequest) -> MapFieldsResponse:
+    """
+    從 OCR 文本提取欄位值
+
+    使用三層映射架構（Tier 1/2/3）從 OCR 文本中提取發票欄位值。
+    支援多種提取方法：regex, keyword, position, azure_field。
+
+    Args:
+        request: 包含 OCR 文本和映射規則的請求
+
+    Returns:
+        欄位映射結果，包含每個欄位的值、信心度和來源
+    """
+    if field_mapper is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Field mapper not initialized",
+        )
+
+    return _map_fields_one(request)
+
+
+@app.post("/map-fields/batch", response_model=MapFieldsBatchResponse)
+async def map_fields_batch(request: MapFieldsBatchRequest) -> MapFieldsBatchResponse:
+    """
+    批次映射多份文件的欄位（用於大量重新處理）
+
+    單次請求處理多份文件，共用同一映射器；相同規則的文件共用已編譯的正則
+    與關鍵字自動機。單份文件失敗不影響其他文件。
+
+    Args:
+        request: 包含多份文件的請求
+
+    Returns:
+        各文件的映射結果（順序與請求一致）
+    """
+    if field_mapper is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Field mapper not initialized",
+        )
+
+    logger.info("map_fields_batch_request", document_count=len(request.documents))
+
+    results = []
+    for document in request.documents:
+        results.append(_map_fields_one(document))
+        # 逐份讓出事件迴圈，大型批次不會阻塞 /health 與其他請求
+        # （不改用執行緒池：映射器的結果快取與 rules_applied 非執行緒安全）
+        await asyncio.sleep(0)
+
+    return MapFieldsBatchResponse.model_construct(
+        success=True,
+        results=results,
+        total=len(results),
+    )
+
+
 # ============================================================
 # Entry Point
 # ============================================================
@@ -536,4 +671,7 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        workers=1 if settings.debug else settings.workers,
     )
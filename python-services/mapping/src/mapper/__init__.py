@@ -3,11 +3,12 @@
 @description
   欄位映射模組，提供：
   - FieldMapper: 核心欄位映射類
+  - CompiledRuleSet: 預先整理的規則集（可跨文件重複使用）
   - 相關資料模型
 
 @module python-services/mapping/src/mapper
 @since Epic 2 - Story 2.4 (Field Mapping & Extraction)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 """
 
 from .models import (
@@ -24,12 +25,15 @@ from .models import (
     UnmappedFieldDetail,
     MapFieldsRequest,
     MapFieldsResponse,
+    MapFieldsBatchRequest,
+    MapFieldsBatchResponse,
 )
-from .field_mapper import FieldMapper
+from .field_mapper import CompiledRuleSet, FieldMapper
 
 __all__ = [
     # Classes
     "FieldMapper",
+    "CompiledRuleSet",
     # Enums
     "ExtractionMethod",
     "ConfidenceSource",
@@ -46,4 +50,6 @@ __all__ = [
     "UnmappedFieldDetail",
     "MapFieldsRequest",
     "MapFieldsResponse",
+    "MapFieldsBatchRequest",
+    "MapFieldsBatchResponse",
 ]
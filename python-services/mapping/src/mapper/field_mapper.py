@@ -14,21 +14,44 @@
 
 @module python-services/mapping/src/mapper/field_mapper
 @since Epic 2 - Story 2.4 (Field Mapping & Extraction)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 
 @features
   - 多種提取方法支援
   - 信心度計算
   - 欄位驗證
   - 值正規化（日期、金額等）
+  - 規則正則編譯快取（固定正則於模組載入時預先編譯）
+  - 規則正則可由 RE2 執行（線性時間，避免災難性回溯）
+  - 所有關鍵字規則的關鍵字以單一 Aho-Corasick 自動機一次掃描
+  - 所有正則提取規則以 Hyperscan 一次掃描預篩，略過確定不會命中的正則
+  - 長文本且 RE2 可用時，各欄位以執行緒池平行提取
+  - 內部產生的結果模型以 model_construct 建立（不重複驗證）
+  - 值正規化結果快取（重複出現的日期 / 金額 / 重量字串不再重新解析）
+  - 規則集可預先整理（compile_ruleset）並跨文件重複使用
+  - 可選的映射結果快取（以文本與規則內容雜湊為鍵，重新處理時略過提取）
 """
 
+import calendar
+import hashlib
+import json
+import os
 import re
 import time
-from datetime import datetime
-from typing import Optional
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from itertools import pairwise
+from operator import attrgetter
+from typing import Optional, Union
 import structlog
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - 可選依賴
+    ahocorasick = None
+
 from .models import (
     ConfidenceSource,
     ExtractionMethod,
@@ -39,9 +62,130 @@ from .models import (
     ExtractionStatistics,
     UnmappedFieldDetail,
 )
+from .regex_engine import (
+    RE2_AVAILABLE,
+    REGEX_CACHE_SIZE,
+    RulePattern,
+    compile_rule_regex,
+    prefilter_rule_regexes,
+)
 
 logger = structlog.get_logger(__name__)
 
+# 平行提取：RE2 匹配時釋放 GIL，文本夠長時各欄位改由執行緒池平行提取
+PARALLEL_MIN_TEXT_LENGTH = 32 * 1024
+MAX_EXTRACTION_WORKERS = min(8, os.cpu_count() or 1)
+
+# 規則標誌字元 → re 標誌位元（以 int 運算，避免 RegexFlag 列舉運算的開銷）
+_RULE_FLAG_BITS = (
+    ("i", re.IGNORECASE.value),
+    ("m", re.MULTILINE.value),
+    ("s", re.DOTALL.value),
+)
+
+# 不重複的提取正則達此數量才以 Hyperscan 預篩（只有一條時直接搜尋較快）
+PREFILTER_MIN_PATTERNS = 2
+
+# 關鍵字後的值：到行尾或下一個 | 為止
+_VALUE_AFTER_KEYWORD_RE = re.compile(r"^([^\n\r|]{1,100})")
+# 值尾部要移除的標點與空白（等同 [,;:\s]+$；Unicode 空白字元皆位於 U+3000 以內）
+_TRAILING_PUNCTUATION = ",;:" + "".join(filter(str.isspace, map(chr, range(0x3001))))
+
+# 欄位名稱含以下字詞時以金額正規化
+AMOUNT_FIELD_KEYWORDS = ("amount", "charge", "fee", "cost", "total", "price", "duty", "tax")
+# 欄位名稱 → 正規化策略快取筆數
+NORMALIZATION_CACHE_SIZE = 1024
+# (值, 正規化策略) → 正規化結果快取筆數
+VALUE_NORMALIZATION_CACHE_SIZE = 4096
+
+# strptime 接受的兩位數月 / 日寫法（%m 僅 ASCII；%d 第二位可為任意 Unicode 數字）
+_STRPTIME_MONTH_RE = re.compile(r"1[0-2]|0[1-9]")
+_STRPTIME_DAY_RE = re.compile(r"3[01]|[12]\d|0[1-9]")
+
+# 金額 / 重量正規化
+_WEIGHT_UNIT_RE = re.compile(r"(kg|lb|lbs|kgs|g|gram|grams)\.?", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"[\d.,]+")
+
+class _AmountCharFilter(dict):
+    """
+    金額字元過濾表（供 str.translate 使用）
+
+    保留數字（與 re 的 \\d 相同，即 str.isdecimal）及 . , -，其餘刪除；
+    查表結果於首次遇到時計算並快取，僅快取 BMP 範圍以限制表的大小。
+    """
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        result = codepoint if char.isdecimal() or char in ".,-" else None
+        if codepoint < 0x10000:
+            self[codepoint] = result
+        return result
+
+
+_AMOUNT_CHAR_FILTER = _AmountCharFilter()
+
+# 規則排序鍵（優先級）
+_RULE_PRIORITY = attrgetter("priority")
+
+
+def _is_priority_ordered(rules: list[MappingRule]) -> bool:
+    """規則是否已按優先級降序排列"""
+    return all(a.priority >= b.priority for a, b in pairwise(rules))
+
+
+# 關鍵字自動機快取筆數（同一 Forwarder 的文件關鍵字集合相同）
+KEYWORD_AUTOMATON_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=KEYWORD_AUTOMATON_CACHE_SIZE)
+def _keyword_automaton(keywords: frozenset[str]):
+    """建立關鍵字集合的 Aho-Corasick 自動機（快取，批次處理時跨文件共用）"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def _validation_regex(pattern: str) -> tuple[Optional[RulePattern], Optional[str]]:
+    """
+    編譯驗證正則（快取）
+
+    無效正則同樣快取其錯誤訊息：compile_rule_regex 不快取失敗結果，
+    否則每次驗證都會重新解析一次無效正則。
+
+    Returns:
+        (編譯後的正則, None)，無效時為 (None, 錯誤訊息)
+    """
+    try:
+        return compile_rule_regex(pattern), None
+    except re.error as e:
+        return None, str(e)
+
+
+@dataclass(slots=True)
+class CompiledRuleSet:
+    """
+    預先整理的規則集（compile_ruleset 產生，map_fields 唯讀）
+
+    同一組規則套用於多份文件時（如同一 Forwarder 的批次重新處理），可整理一次後
+    重複傳入 map_fields，省去逐份文件的分組、排序、正則編譯與關鍵字收集。
+    """
+
+    rules: tuple[MappingRule, ...]
+    field_names: tuple[str, ...]
+    # 各欄位的規則（依優先級降序），順序同 field_names
+    field_rules: tuple[list[MappingRule], ...]
+    # 可編譯的提取正則 (正則, 標誌)，已排序（正則預篩用）
+    regex_keys: tuple[tuple[str, int], ...]
+    # 關鍵字規則的所有小寫關鍵字（關鍵字掃描用）
+    keywords: frozenset[str]
+    # 是否含關鍵字規則（沒有時不產生小寫文本）
+    has_keyword_rules: bool
+    # 規則內容雜湊（結果快取鍵用，首次需要時計算；無法序列化時為 b""）
+    fingerprint: Optional[bytes] = None
+
 
 class FieldMapper:
     """
@@ -68,20 +212,46 @@ class FieldMapper:
         (r"(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})", None),  # 18 Dec 2024
     ]
 
+    # 所有日期格式合併為單一正則，一次掃描取得每個格式最左邊的匹配：
+    # 交替式包在前瞻中，每個位置都會嘗試；各格式在同一位置互斥
+    # （第 2、3 個字元分別為數字、/、-、. 或空白），不會互相遮蔽。
+    # 第 i 個格式的群組為 4i+1（整體）與 4i+2 ~ 4i+4（年月日等）
+    _DATE_UNION_RE = re.compile(
+        "(?=" + "|".join(f"({pattern})" for pattern, _ in DATE_PATTERNS) + ")",
+        re.IGNORECASE,
+    )
+    _DATE_FORMATS = [date_format for _, date_format in DATE_PATTERNS]
+
+    # 標準格式中（年, 月, 日）所在的群組位置
+    _DATE_FIELD_ORDER = {
+        "%Y-%m-%d": (0, 1, 2),
+        "%m/%d/%Y": (2, 0, 1),
+        "%m-%d-%Y": (2, 0, 1),
+        "%d.%m.%Y": (2, 1, 0),
+    }
+
     MONTH_MAP = {
         "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
         "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
         "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12",
     }
 
-    def __init__(self):
-        """初始化映射器"""
+    def __init__(self, cache_size: int = 0):
+        """
+        初始化映射器
+
+        Args:
+            cache_size: 映射結果快取筆數（0 表示停用）
+        """
         self.rules_applied = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cache_size = cache_size
+        self._cache: OrderedDict[bytes, tuple] = OrderedDict()
 
     def map_fields(
         self,
         ocr_text: str,
-        rules: list[MappingRule],
+        rules: Union[list[MappingRule], CompiledRuleSet],
         azure_invoice_data: Optional[dict] = None,
         forwarder_id: Optional[str] = None,
     ) -> tuple[dict[str, FieldMappingResult], dict[str, UnmappedFieldDetail], ExtractionStatistics]:
@@ -90,42 +260,166 @@ class FieldMapper:
 
         Args:
             ocr_text: OCR 提取的文本
-            rules: 映射規則列表（已按優先級排序）
+            rules: 映射規則列表（已按優先級排序），或 compile_ruleset 整理後的規則集
             azure_invoice_data: Azure Document Intelligence 發票數據
             forwarder_id: Forwarder ID（用於決定 tier 來源）
 
         Returns:
             tuple: (欄位映射結果, 未映射欄位詳情, 提取統計)
         """
+        if self._cache_size <= 0:
+            return self._map_fields(ocr_text, rules, azure_invoice_data, forwarder_id)
+
+        start_time = time.time()
+        if not isinstance(rules, CompiledRuleSet):
+            rules = self.compile_ruleset(rules)
+        key = self._cache_key(ocr_text, rules, azure_invoice_data, forwarder_id)
+        if key is None:
+            return self._map_fields(ocr_text, rules, azure_invoice_data, forwarder_id)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            field_mappings, unmapped_details, statistics, self.rules_applied = cached
+            return self._copy_result(
+                field_mappings,
+                unmapped_details,
+                statistics,
+                processing_time=int((time.time() - start_time) * 1000),
+            )
+
+        field_mappings, unmapped_details, statistics = self._map_fields(
+            ocr_text, rules, azure_invoice_data, forwarder_id
+        )
+        self._cache[key] = (field_mappings, unmapped_details, statistics, self.rules_applied)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return self._copy_result(
+            field_mappings,
+            unmapped_details,
+            statistics,
+            processing_time=statistics.processing_time_ms,
+        )
+
+    def clear_cache(self) -> None:
+        """清除映射結果快取"""
+        self._cache.clear()
+
+    @staticmethod
+    def _cache_key(
+        ocr_text: str,
+        ruleset: CompiledRuleSet,
+        azure_invoice_data: Optional[dict],
+        forwarder_id: Optional[str],
+    ) -> Optional[bytes]:
+        """
+        計算映射結果快取鍵（文本雜湊 + 規則集雜湊 + Azure 數據 / Forwarder 雜湊）
+
+        規則集雜湊每個 CompiledRuleSet 只計算一次；含無法序列化為 JSON 的值時回傳 None（不快取）。
+        """
+        if ruleset.fingerprint is None:
+            ruleset.fingerprint = FieldMapper._ruleset_fingerprint(ruleset.rules)
+        if not ruleset.fingerprint:
+            return None
+        try:
+            context = json.dumps([azure_invoice_data, forwarder_id], sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return (
+            hashlib.blake2b(ocr_text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+            + ruleset.fingerprint
+            + hashlib.blake2b(context.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        )
+
+    @staticmethod
+    def _ruleset_fingerprint(rules: tuple[MappingRule, ...]) -> bytes:
+        """
+        計算規則內容雜湊
+
+        只序列化影響映射結果的欄位，規則順序會影響結果，故依原順序序列化；
+        含無法序列化為 JSON 的值時回傳 b""。
+        """
+        try:
+            content = json.dumps(
+                [
+                    [
+                        rule.id,
+                        rule.field_name,
+                        rule.extraction_pattern,
+                        rule.priority,
+                        rule.validation_pattern,
+                    ]
+                    for rule in rules
+                ],
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            return b""
+        return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    @staticmethod
+    def _copy_result(
+        field_mappings: dict[str, FieldMappingResult],
+        unmapped_details: dict[str, UnmappedFieldDetail],
+        statistics: ExtractionStatistics,
+        processing_time: int,
+    ) -> tuple[dict[str, FieldMappingResult], dict[str, UnmappedFieldDetail], ExtractionStatistics]:
+        """複製快取中的結果，避免呼叫端修改污染快取"""
+        return (
+            {name: result.model_copy(deep=True) for name, result in field_mappings.items()},
+            {
+                name: detail.model_copy(update={"attempts": list(detail.attempts)})
+                for name, detail in unmapped_details.items()
+            },
+            statistics.model_copy(update={"processing_time_ms": processing_time}),
+        )
+
+    def _map_fields(
+        self,
+        ocr_text: str,
+        rules: Union[list[MappingRule], CompiledRuleSet],
+        azure_invoice_data: Optional[dict],
+        forwarder_id: Optional[str],
+    ) -> tuple[dict[str, FieldMappingResult], dict[str, UnmappedFieldDetail], ExtractionStatistics]:
+        """執行欄位映射（不經快取，參數與回傳值同 map_fields）"""
         start_time = time.time()
         self.rules_applied = 0
+        ruleset = rules if isinstance(rules, CompiledRuleSet) else self.compile_ruleset(rules)
 
         # 結果容器
         field_mappings: dict[str, FieldMappingResult] = {}
         unmapped_details: dict[str, UnmappedFieldDetail] = {}
 
-        # 按欄位名稱分組規則
-        rules_by_field: dict[str, list[MappingRule]] = {}
-        for rule in rules:
-            if rule.field_name not in rules_by_field:
-                rules_by_field[rule.field_name] = []
-            rules_by_field[rule.field_name].append(rule)
-
-        # 對每個欄位執行提取
-        for field_name, field_rules in rules_by_field.items():
-            # 按優先級排序（降序）
-            sorted_rules = sorted(field_rules, key=lambda r: r.priority, reverse=True)
-
-            result = self._extract_field(
-                field_name=field_name,
-                rules=sorted_rules,
-                ocr_text=ocr_text,
-                azure_invoice_data=azure_invoice_data,
-                forwarder_id=forwarder_id,
-            )
+        # 小寫文本每份文件只產生一次，且僅供關鍵字規則使用（含 CJK 的長文本
+        # lower() 成本不低）；一次掃描定位所有關鍵字規則的關鍵字
+        ocr_text_lower = ocr_text.lower() if ruleset.has_keyword_rules else ""
+        keyword_positions = self._locate_keywords(ocr_text_lower, ruleset.keywords)
+        azure_fields = self._index_azure_fields(azure_invoice_data)
+        field_names = ruleset.field_names
+        field_rules = ruleset.field_rules
+
+        # 對每個欄位執行提取（各欄位互相獨立，結果依欄位順序收集）
+        extract = partial(
+            self._extract_field,
+            ocr_text=ocr_text,
+            ocr_text_lower=ocr_text_lower,
+            keyword_positions=keyword_positions,
+            azure_fields=azure_fields,
+            regex_matches=self._prefilter_regex_matches(ocr_text, ruleset.regex_keys),
+            forwarder_id=forwarder_id,
+        )
+        if self._should_parallelize(ocr_text, len(field_names)):
+            results = self._get_executor().map(extract, field_names, field_rules)
+        else:
+            results = map(extract, field_names, field_rules)
 
+        # 收集結果時同步累計信心度，統計時不再走訪一次結果
+        total_confidence = 0.0
+        for field_name, sorted_rules, result in zip(field_names, field_rules, results):
             if result:
                 field_mappings[field_name] = result
+                total_confidence += result.confidence
+                self.rules_applied += 1
             else:
                 # 記錄未映射原因
                 unmapped_details[field_name] = UnmappedFieldDetail(
@@ -136,19 +430,211 @@ class FieldMapper:
         # 計算統計
         processing_time = int((time.time() - start_time) * 1000)
         statistics = self._calculate_statistics(
-            field_mappings=field_mappings,
-            total_rules=len(rules_by_field),
+            mapped_count=len(field_mappings),
+            total_confidence=total_confidence,
+            total_rules=len(field_names),
             processing_time=processing_time,
         )
 
         return field_mappings, unmapped_details, statistics
 
+    @staticmethod
+    def _should_parallelize(ocr_text: str, field_count: int) -> bool:
+        """
+        判斷是否以執行緒池平行提取
+
+        re 匹配期間持有 GIL，平行化沒有效益；短文本時執行緒切換成本高於匹配本身。
+        """
+        return (
+            RE2_AVAILABLE
+            and MAX_EXTRACTION_WORKERS > 1
+            and field_count > 1
+            and len(ocr_text) >= PARALLEL_MIN_TEXT_LENGTH
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """取得提取用執行緒池（首次使用時建立，避免在 fork 前建立執行緒）"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=MAX_EXTRACTION_WORKERS,
+                thread_name_prefix="field-extract",
+            )
+        return self._executor
+
+    def compile_ruleset(self, rules: list[MappingRule]) -> CompiledRuleSet:
+        """
+        整理規則集（單次走訪所有規則）
+
+        - 按欄位名稱分組，並依優先級排序（降序）；已排序的欄位沿用原順序
+        - 預先編譯提取與驗證正則（暖機快取）；無效正則於此略過，實際提取時才記錄警告
+        - 收集正則預篩所需的提取正則，與關鍵字掃描所需的關鍵字
+
+        Args:
+            rules: 映射規則列表
+
+        Returns:
+            整理後的規則集
+        """
+        rules_by_field: dict[str, list[MappingRule]] = defaultdict(list)
+        regex_keys: set[tuple[str, int]] = set()
+        keywords: set[str] = set()
+        has_keyword_rules = False
+
+        for rule in rules:
+            rules_by_field[rule.field_name].append(rule)
+            if rule.validation_pattern:
+                _validation_regex(rule.validation_pattern)
+            pattern = rule.extraction_pattern
+            method = pattern.get("method", "regex")
+            try:
+                if method == "regex" and pattern.get("pattern"):
+                    regex_pattern = pattern["pattern"]
+                    flags = self._regex_flags(pattern.get("flags", ""))
+                    compile_rule_regex(regex_pattern, flags)
+                    if isinstance(regex_pattern, str):
+                        regex_keys.add((regex_pattern, flags))
+                elif method == "keyword":
+                    has_keyword_rules = True
+                    rule_keywords = pattern.get("keywords")
+                    if isinstance(rule_keywords, list):
+                        keywords.update(k.lower() for k in rule_keywords if isinstance(k, str))
+            except (re.error, TypeError):
+                continue
+
+        return CompiledRuleSet(
+            rules=tuple(rules),
+            field_names=tuple(rules_by_field),
+            field_rules=tuple(
+                field_rule_list
+                if _is_priority_ordered(field_rule_list)
+                else sorted(field_rule_list, key=_RULE_PRIORITY, reverse=True)
+                for field_rule_list in rules_by_field.values()
+            ),
+            regex_keys=tuple(sorted(regex_keys)),
+            keywords=frozenset(keywords),
+            has_keyword_rules=has_keyword_rules,
+        )
+
+    @staticmethod
+    def _prefilter_regex_matches(
+        ocr_text: str, regex_keys: tuple[tuple[str, int], ...]
+    ) -> dict[tuple[str, int], Optional[re.Match]]:
+        """
+        預篩所有正則提取規則，預先填入確定不會命中的搜尋結果（None）
+
+        Args:
+            ocr_text: OCR 文本
+            regex_keys: 提取正則 (正則, 標誌)（見 CompiledRuleSet）
+
+        Returns:
+            (正則, 標誌) → None（見 _extract_regex 的 regex_matches）
+        """
+        if len(regex_keys) < PREFILTER_MIN_PATTERNS:
+            return {}
+
+        return dict.fromkeys(prefilter_rule_regexes(regex_keys, ocr_text))
+
+    @staticmethod
+    def _locate_keywords(ocr_text_lower: str, keywords: frozenset[str]) -> dict[str, int]:
+        """
+        一次掃描找出所有關鍵字規則中關鍵字的首次出現位置
+
+        所有規則的關鍵字合併為單一 Aho-Corasick 自動機，小寫文本只掃描一次；
+        未安裝 pyahocorasick 時每個不重複的關鍵字各 find 一次。
+
+        Args:
+            ocr_text_lower: 小寫 OCR 文本
+            keywords: 小寫關鍵字（見 CompiledRuleSet）
+
+        Returns:
+            小寫關鍵字 → 於小寫文本中的首次出現位置（未出現為 -1）
+        """
+        if not keywords:
+            return {}
+
+        positions = dict.fromkeys(keywords, -1)
+        # 空字串無法加入自動機，find 結果固定為 0
+        if "" in keywords:
+            positions[""] = 0
+            keywords = keywords - {""}
+
+        if ahocorasick is None:
+            for keyword in keywords:
+                positions[keyword] = ocr_text_lower.find(keyword)
+            return positions
+
+        if not keywords:
+            return positions
+
+        automaton = _keyword_automaton(keywords)
+
+        # 命中依結束位置遞增，同一關鍵字的第一次命中即為首次出現
+        remaining = len(keywords)
+        for end_index, keyword in automaton.iter(ocr_text_lower):
+            if positions[keyword] == -1:
+                positions[keyword] = end_index - len(keyword) + 1
+                remaining -= 1
+                if not remaining:
+                    break
+        return positions
+
+    @staticmethod
+    def _index_azure_fields(azure_data: Optional[dict]) -> Optional[tuple[dict, dict]]:
+        """
+        建立 Azure 欄位索引（每份文件一次）
+
+        除原始欄位外另建小寫鍵索引，不區分大小寫的查找不再逐一比對所有欄位。
+
+        Args:
+            azure_data: Azure 發票數據
+
+        Returns:
+            (原始欄位, 小寫鍵 → 欄位值)；無 Azure 數據時為 None
+        """
+        if not azure_data:
+            return None
+
+        # Azure Invoice 欄位通常在 fields 或直接在根級別
+        if "fields" in azure_data:
+            fields = azure_data["fields"]
+        else:
+            fields = azure_data
+        if not isinstance(fields, dict):
+            return None
+
+        fields_by_lower: dict[str, object] = {}
+        for key, value in fields.items():
+            if isinstance(key, str):
+                # 多個鍵小寫後相同時，與逐一比對相同取第一個
+                fields_by_lower.setdefault(key.lower(), value)
+        return fields, fields_by_lower
+
+    @staticmethod
+    def _regex_flags(flags_str: str) -> int:
+        """
+        將規則中的標誌字串（i / m / s）轉為 re 標誌
+
+        Args:
+            flags_str: 標誌字串
+
+        Returns:
+            re 標誌
+        """
+        flags = 0
+        for flag_char, flag_bit in _RULE_FLAG_BITS:
+            if flag_char in flags_str:
+                flags |= flag_bit
+        return flags
+
     def _extract_field(
         self,
         field_name: str,
         rules: list[MappingRule],
         ocr_text: str,
-        azure_invoice_data: Optional[dict],
+        ocr_text_lower: str,
+        keyword_positions: dict[str, int],
+        azure_fields: Optional[tuple[dict, dict]],
+        regex_matches: dict[tuple[str, int], Optional[re.Match]],
         forwarder_id: Optional[str],
     ) -> Optional[FieldMappingResult]:
         """
@@ -160,7 +646,10 @@ class FieldMapper:
             field_name: 欄位名稱
             rules: 該欄位的規則列表
             ocr_text: OCR 文本
-            azure_invoice_data: Azure 發票數據
+            ocr_text_lower: 小寫 OCR 文本
+            keyword_positions: 關鍵字首次出現位置（見 _locate_keywords）
+            azure_fields: Azure 欄位索引（見 _index_azure_fields）
+            regex_matches: 本文件的正則搜尋結果（(正則, 標誌) → 匹配），各欄位共用
             forwarder_id: Forwarder ID
 
         Returns:
@@ -176,7 +665,7 @@ class FieldMapper:
                 if method == "azure_field":
                     result = self._extract_azure_field(
                         pattern=pattern,
-                        azure_data=azure_invoice_data,
+                        azure_fields=azure_fields,
                         rule=rule,
                         forwarder_id=forwarder_id,
                     )
@@ -184,6 +673,7 @@ class FieldMapper:
                     result = self._extract_regex(
                         pattern=pattern,
                         ocr_text=ocr_text,
+                        regex_matches=regex_matches,
                         rule=rule,
                         forwarder_id=forwarder_id,
                     )
@@ -191,6 +681,8 @@ class FieldMapper:
                     result = self._extract_keyword(
                         pattern=pattern,
                         ocr_text=ocr_text,
+                        ocr_text_lower=ocr_text_lower,
+                        keyword_positions=keyword_positions,
                         rule=rule,
                         forwarder_id=forwarder_id,
                     )
@@ -200,7 +692,6 @@ class FieldMapper:
                     continue
 
                 if result and result.value:
-                    self.rules_applied += 1
                     return result
 
             except Exception as e:
@@ -218,7 +709,7 @@ class FieldMapper:
     def _extract_azure_field(
         self,
         pattern: dict,
-        azure_data: Optional[dict],
+        azure_fields: Optional[tuple[dict, dict]],
         rule: MappingRule,
         forwarder_id: Optional[str],
     ) -> Optional[FieldMappingResult]:
@@ -227,14 +718,14 @@ class FieldMapper:
 
         Args:
             pattern: 提取模式
-            azure_data: Azure 發票數據
+            azure_fields: Azure 欄位索引（見 _index_azure_fields）
             rule: 映射規則
             forwarder_id: Forwarder ID
 
         Returns:
             欄位映射結果或 None
         """
-        if not azure_data:
+        if not azure_fields:
             return None
 
         azure_field_name = pattern.get("azureFieldName") or pattern.get("azure_field_name")
@@ -242,24 +733,19 @@ class FieldMapper:
             return None
 
         # 從 Azure 數據中查找欄位
-        value = self._get_azure_field_value(azure_data, azure_field_name)
+        value = self._get_azure_field_value(azure_fields, azure_field_name)
         if value is None:
             return None
 
         # 計算信心度
         confidence_boost = pattern.get("confidenceBoost") or pattern.get("confidence_boost", 0)
         base_confidence = self.BASE_CONFIDENCE["azure_field"]
-        confidence = min(100, base_confidence + confidence_boost)
-
-        # 正規化值
-        normalized_value = self._normalize_value(value, rule.field_name)
+        confidence = float(min(100, base_confidence + confidence_boost))
 
-        # 驗證
-        is_valid, validation_error = self._validate_value(
-            normalized_value, rule.validation_pattern
-        )
+        # 正規化並驗證值
+        normalized_value, is_valid, validation_error = self._finalize_value(value, rule)
 
-        return FieldMappingResult(
+        return FieldMappingResult.model_construct(
             value=normalized_value,
             raw_value=str(value),
             confidence=confidence,
@@ -274,6 +760,7 @@ class FieldMapper:
         self,
         pattern: dict,
         ocr_text: str,
+        regex_matches: dict[tuple[str, int], Optional[re.Match]],
         rule: MappingRule,
         forwarder_id: Optional[str],
     ) -> Optional[FieldMappingResult]:
@@ -283,6 +770,7 @@ class FieldMapper:
         Args:
             pattern: 提取模式
             ocr_text: OCR 文本
+            regex_matches: 本文件的正則搜尋結果（見 _extract_field）
             rule: 映射規則
             forwarder_id: Forwarder ID
 
@@ -294,17 +782,16 @@ class FieldMapper:
             return None
 
         # 準備正則表達式標誌
-        flags_str = pattern.get("flags", "")
-        flags = 0
-        if "i" in flags_str:
-            flags |= re.IGNORECASE
-        if "m" in flags_str:
-            flags |= re.MULTILINE
-        if "s" in flags_str:
-            flags |= re.DOTALL
+        flags = self._regex_flags(pattern.get("flags", ""))
 
         try:
-            match = re.search(regex_pattern, ocr_text, flags)
+            # 多個欄位共用同一正則時，每份文件只搜尋一次
+            cache_key = (regex_pattern, flags)
+            if cache_key in regex_matches:
+                match = regex_matches[cache_key]
+            else:
+                match = compile_rule_regex(regex_pattern, flags).search(ocr_text)
+                regex_matches[cache_key] = match
             if not match:
                 return None
 
@@ -321,20 +808,15 @@ class FieldMapper:
             # 計算信心度
             confidence_boost = pattern.get("confidenceBoost") or pattern.get("confidence_boost", 0)
             base_confidence = self.BASE_CONFIDENCE["regex"]
-            confidence = min(100, base_confidence + confidence_boost)
+            confidence = float(min(100, base_confidence + confidence_boost))
 
             # 決定來源 tier
             source = self._determine_source(rule, forwarder_id)
 
-            # 正規化值
-            normalized_value = self._normalize_value(raw_value, rule.field_name)
-
-            # 驗證
-            is_valid, validation_error = self._validate_value(
-                normalized_value, rule.validation_pattern
-            )
+            # 正規化並驗證值
+            normalized_value, is_valid, validation_error = self._finalize_value(raw_value, rule)
 
-            return FieldMappingResult(
+            return FieldMappingResult.model_construct(
                 value=normalized_value,
                 raw_value=raw_value,
                 confidence=confidence,
@@ -353,6 +835,8 @@ class FieldMapper:
         self,
         pattern: dict,
         ocr_text: str,
+        ocr_text_lower: str,
+        keyword_positions: dict[str, int],
         rule: MappingRule,
         forwarder_id: Optional[str],
     ) -> Optional[FieldMappingResult]:
@@ -362,6 +846,8 @@ class FieldMapper:
         Args:
             pattern: 提取模式
             ocr_text: OCR 文本
+            ocr_text_lower: 小寫 OCR 文本
+            keyword_positions: 關鍵字首次出現位置（見 _locate_keywords）
             rule: 映射規則
             forwarder_id: Forwarder ID
 
@@ -373,18 +859,21 @@ class FieldMapper:
             return None
 
         max_distance = pattern.get("maxDistance") or pattern.get("max_distance", 50)
-        text_lower = ocr_text.lower()
+        text_length = len(ocr_text)
 
         for keyword in keywords:
             keyword_lower = keyword.lower()
-            idx = text_lower.find(keyword_lower)
+            idx = keyword_positions.get(keyword_lower)
+            if idx is None:
+                # 非列表形式的 keywords 未經預先掃描
+                idx = ocr_text_lower.find(keyword_lower)
 
             if idx == -1:
                 continue
 
             # 在關鍵字後查找值
             start_pos = idx + len(keyword)
-            end_pos = min(start_pos + max_distance, len(ocr_text))
+            end_pos = min(start_pos + max_distance, text_length)
             context = ocr_text[start_pos:end_pos]
 
             # 嘗試提取值（簡單策略：找到冒號後的內容或下一個詞）
@@ -395,20 +884,15 @@ class FieldMapper:
             # 計算信心度
             confidence_boost = pattern.get("confidenceBoost") or pattern.get("confidence_boost", 0)
             base_confidence = self.BASE_CONFIDENCE["keyword"]
-            confidence = min(100, base_confidence + confidence_boost)
+            confidence = float(min(100, base_confidence + confidence_boost))
 
             # 決定來源 tier
             source = self._determine_source(rule, forwarder_id)
 
-            # 正規化值
-            normalized_value = self._normalize_value(value, rule.field_name)
+            # 正規化並驗證值
+            normalized_value, is_valid, validation_error = self._finalize_value(value, rule)
 
-            # 驗證
-            is_valid, validation_error = self._validate_value(
-                normalized_value, rule.validation_pattern
-            )
-
-            return FieldMappingResult(
+            return FieldMappingResult.model_construct(
                 value=normalized_value,
                 raw_value=value,
                 confidence=confidence,
@@ -438,48 +922,42 @@ class FieldMapper:
             return None
 
         # 嘗試提取到行尾或下一個主要分隔符
-        match = re.match(r"^([^\n\r|]{1,100})", context)
+        match = _VALUE_AFTER_KEYWORD_RE.match(context)
         if match:
             value = match.group(1).strip()
             # 移除尾部標點
-            value = re.sub(r"[,;:\s]+$", "", value)
+            value = value.rstrip(_TRAILING_PUNCTUATION)
             return value if value else None
 
         return None
 
-    def _get_azure_field_value(self, azure_data: dict, field_name: str) -> Optional[str]:
+    def _get_azure_field_value(
+        self, azure_fields: tuple[dict, dict], field_name: str
+    ) -> Optional[str]:
         """
         從 Azure 發票數據中獲取欄位值
 
         Args:
-            azure_data: Azure 發票數據
+            azure_fields: Azure 欄位索引（見 _index_azure_fields）
             field_name: 欄位名稱
 
         Returns:
             欄位值或 None
         """
-        # Azure Invoice 欄位通常在 fields 或直接在根級別
-        if "fields" in azure_data:
-            fields = azure_data["fields"]
-        else:
-            fields = azure_data
+        fields, fields_by_lower = azure_fields
 
-        # 嘗試直接獲取
+        # 嘗試直接獲取，再嘗試不區分大小寫匹配
         if field_name in fields:
             field_data = fields[field_name]
-            if isinstance(field_data, dict):
-                return field_data.get("value") or field_data.get("content")
-            return str(field_data)
-
-        # 嘗試不區分大小寫匹配
-        field_name_lower = field_name.lower()
-        for key, value in fields.items():
-            if key.lower() == field_name_lower:
-                if isinstance(value, dict):
-                    return value.get("value") or value.get("content")
-                return str(value)
+        else:
+            field_name_lower = field_name.lower()
+            if field_name_lower not in fields_by_lower:
+                return None
+            field_data = fields_by_lower[field_name_lower]
 
-        return None
+        if isinstance(field_data, dict):
+            return field_data.get("value") or field_data.get("content")
+        return str(field_data)
 
     def _determine_source(self, rule: MappingRule, forwarder_id: Optional[str]) -> str:
         """
@@ -503,47 +981,84 @@ class FieldMapper:
             return ConfidenceSource.TIER2.value
         return ConfidenceSource.TIER1.value
 
-    def _normalize_value(self, value: str, field_name: str) -> str:
+    def _finalize_value(
+        self, value: str, rule: MappingRule
+    ) -> tuple[str, bool, Optional[str]]:
         """
-        正規化欄位值
+        正規化並驗證提取到的值（各提取方式共用）
 
         Args:
             value: 原始值
-            field_name: 欄位名稱（用於決定正規化策略）
+            rule: 映射規則（欄位名稱決定正規化策略，並提供驗證正則）
 
         Returns:
-            正規化後的值
+            tuple: (正規化後的值, 是否有效, 錯誤訊息)
         """
-        if not value:
-            return value
-
-        # 基本清理
-        value = value.strip()
+        if value:
+            # 基本清理
+            value = value.strip()
+            strategies = self._normalization_strategies(rule.field_name)
+            if strategies:
+                value = self._apply_normalization(value, strategies)
+
+        if not rule.validation_pattern:
+            return value, True, None
+        is_valid, validation_error = self._validate_value(value, rule.validation_pattern)
+        return value, is_valid, validation_error
+
+    @classmethod
+    @lru_cache(maxsize=VALUE_NORMALIZATION_CACHE_SIZE)
+    def _apply_normalization(cls, value: str, strategies: tuple[str, ...]) -> str:
+        """
+        依策略序列正規化值（快取）
 
-        # 日期欄位正規化
-        if "date" in field_name.lower():
-            normalized_date = self._normalize_date(value)
-            if normalized_date:
-                return normalized_date
+        正規化結果只取決於值與策略，同一日期 / 金額字串在各文件間重複出現時直接取用。
 
-        # 金額欄位正規化
-        if any(
-            keyword in field_name.lower()
-            for keyword in ["amount", "charge", "fee", "cost", "total", "price", "duty", "tax"]
-        ):
-            normalized_amount = self._normalize_amount(value)
-            if normalized_amount:
-                return normalized_amount
+        Args:
+            value: 已去除前後空白的值
+            strategies: 策略序列（見 _normalization_strategies）
 
-        # 重量欄位正規化
-        if "weight" in field_name.lower():
-            normalized_weight = self._normalize_weight(value)
-            if normalized_weight:
-                return normalized_weight
+        Returns:
+            第一個成功策略的結果，皆失敗時為原值
+        """
+        for strategy in strategies:
+            if strategy == "date":
+                normalized = cls._normalize_date(value)
+            elif strategy == "amount":
+                normalized = cls._normalize_amount(value)
+            else:
+                normalized = cls._normalize_weight(value)
+            if normalized:
+                return normalized
 
         return value
 
-    def _normalize_date(self, value: str) -> Optional[str]:
+    @staticmethod
+    @lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+    def _normalization_strategies(field_name: str) -> tuple[str, ...]:
+        """
+        依欄位名稱決定正規化策略（快取）
+
+        欄位名稱可同時符合多種策略（如 total_weight），依 日期 → 金額 → 重量 順序嘗試。
+
+        Args:
+            field_name: 欄位名稱
+
+        Returns:
+            策略序列（"date" / "amount" / "weight"）
+        """
+        name = field_name.lower()
+        strategies = []
+        if "date" in name:
+            strategies.append("date")
+        if any(keyword in name for keyword in AMOUNT_FIELD_KEYWORDS):
+            strategies.append("amount")
+        if "weight" in name:
+            strategies.append("weight")
+        return tuple(strategies)
+
+    @classmethod
+    def _normalize_date(cls, value: str) -> Optional[str]:
         """
         正規化日期為 YYYY-MM-DD 格式
 
@@ -553,21 +1068,29 @@ class FieldMapper:
         Returns:
             正規化的日期字串或 None
         """
-        for pattern, date_format in self.DATE_PATTERNS:
-            match = re.search(pattern, value, re.IGNORECASE)
+        # 各格式最左邊的匹配（格式索引 → 匹配），依格式順序嘗試
+        first_matches: dict[int, re.Match] = {}
+        for match in cls._DATE_UNION_RE.finditer(value):
+            first_matches.setdefault((match.lastindex - 1) // 4, match)
+
+        for index, date_format in enumerate(cls._DATE_FORMATS):
+            match = first_matches.get(index)
             if match:
+                group_offset = index * 4 + 1
                 try:
                     if date_format:
-                        # 標準格式
-                        date_str = match.group(0)
-                        parsed = datetime.strptime(date_str, date_format)
-                        return parsed.strftime("%Y-%m-%d")
+                        # 標準格式：正則已確認形狀，直接依群組組出 ISO 日期
+                        groups = match.groups()[group_offset:group_offset + 3]
+                        year_index, month_index, day_index = cls._DATE_FIELD_ORDER[date_format]
+                        return cls._format_iso_date(
+                            groups[year_index], groups[month_index], groups[day_index]
+                        )
                     else:
                         # 特殊格式（如 18 Dec 2024）
-                        groups = match.groups()
+                        groups = match.groups()[group_offset:group_offset + 3]
                         if len(groups) == 3:
                             day = groups[0].zfill(2)
-                            month = self.MONTH_MAP.get(groups[1], "01")
+                            month = cls.MONTH_MAP.get(groups[1], "01")
                             year = groups[2]
                             return f"{year}-{month}-{day}"
                 except ValueError:
@@ -575,7 +1098,36 @@ class FieldMapper:
 
         return None
 
-    def _normalize_amount(self, value: str) -> Optional[str]:
+    @staticmethod
+    def _format_iso_date(year: str, month: str, day: str) -> str:
+        """
+        將年月日組成 YYYY-MM-DD，接受範圍與 datetime.strptime 相同
+
+        Args:
+            year: 四位數年份
+            month: 兩位數月份
+            day: 兩位數日期
+
+        Returns:
+            ISO 日期字串
+
+        Raises:
+            ValueError: 月份或日期無效
+        """
+        if not (_STRPTIME_MONTH_RE.fullmatch(month) and _STRPTIME_DAY_RE.fullmatch(day)):
+            raise ValueError(f"invalid date: {year}-{month}-{day}")
+
+        year_number = int(year)
+        day_number = int(day)
+        if year_number < 1 or (
+            day_number > 28 and day_number > calendar.monthrange(year_number, int(month))[1]
+        ):
+            raise ValueError(f"invalid date: {year}-{month}-{day}")
+
+        return f"{year_number}-{month}-{day_number:02d}"
+
+    @staticmethod
+    def _normalize_amount(value: str) -> Optional[str]:
         """
         正規化金額
 
@@ -586,7 +1138,7 @@ class FieldMapper:
             正規化的金額字串（純數字，2位小數）或 None
         """
         # 移除貨幣符號和空格
-        cleaned = re.sub(r"[^\d.,\-]", "", value)
+        cleaned = value.translate(_AMOUNT_CHAR_FILTER)
         if not cleaned:
             return None
 
@@ -611,7 +1163,8 @@ class FieldMapper:
         except ValueError:
             return None
 
-    def _normalize_weight(self, value: str) -> Optional[str]:
+    @classmethod
+    def _normalize_weight(cls, value: str) -> Optional[str]:
         """
         正規化重量值
 
@@ -622,13 +1175,13 @@ class FieldMapper:
             正規化的重量字串或 None
         """
         # 移除單位
-        cleaned = re.sub(r"(kg|lb|lbs|kgs|g|gram|grams)\.?", "", value, flags=re.IGNORECASE)
+        cleaned = _WEIGHT_UNIT_RE.sub("", value)
         cleaned = cleaned.strip()
 
         # 提取數字
-        match = re.search(r"[\d.,]+", cleaned)
+        match = _NUMBER_RE.search(cleaned)
         if match:
-            return self._normalize_amount(match.group(0))
+            return cls._normalize_amount(match.group(0))
 
         return None
 
@@ -648,18 +1201,19 @@ class FieldMapper:
         if not validation_pattern or not value:
             return True, None
 
-        try:
-            if re.match(validation_pattern, value):
-                return True, None
-            else:
-                return False, f"Value does not match pattern: {validation_pattern}"
-        except re.error as e:
-            logger.warning("invalid_validation_pattern", pattern=validation_pattern, error=str(e))
+        validator, error = _validation_regex(validation_pattern)
+        if validator is None:
+            logger.warning("invalid_validation_pattern", pattern=validation_pattern, error=error)
             return True, None  # 模式無效時視為通過
 
+        if validator.match(value):
+            return True, None
+        return False, f"Value does not match pattern: {validation_pattern}"
+
     def _calculate_statistics(
         self,
-        field_mappings: dict[str, FieldMappingResult],
+        mapped_count: int,
+        total_confidence: float,
         total_rules: int,
         processing_time: int,
     ) -> ExtractionStatistics:
@@ -667,24 +1221,23 @@ class FieldMapper:
         計算提取統計
 
         Args:
-            field_mappings: 欄位映射結果
+            mapped_count: 已映射欄位數
+            total_confidence: 已映射欄位的信心度總和（收集結果時累計）
             total_rules: 總規則數（即總欄位數）
             processing_time: 處理時間（毫秒）
 
         Returns:
             提取統計
         """
-        mapped_count = len(field_mappings)
         unmapped_count = total_rules - mapped_count
 
         # 計算平均信心度
         if mapped_count > 0:
-            total_confidence = sum(r.confidence for r in field_mappings.values())
             avg_confidence = total_confidence / mapped_count
         else:
             avg_confidence = 0.0
 
-        return ExtractionStatistics(
+        return ExtractionStatistics.model_construct(
             total_fields=total_rules,
             mapped_fields=mapped_count,
             unmapped_fields=unmapped_count,
@@ -9,7 +9,7 @@
 
 @module python-services/mapping/src/mapper/models
 @since Epic 2 - Story 2.4 (Field Mapping & Extraction)
-@lastModified 2025-12-18
+@lastModified 2026-10-15
 """
 
 from enum import Enum
@@ -211,3 +211,20 @@ class MapFieldsResponse(BaseModel):
 
     class Config:
         populate_by_name = True
+
+
+class MapFieldsBatchRequest(BaseModel):
+    """批次欄位映射請求"""
+    documents: list[MapFieldsRequest] = Field(
+        ...,
+        description="待映射的文件列表",
+        min_length=1,
+        max_length=100,
+    )
+
+
+class MapFieldsBatchResponse(BaseModel):
+    """批次欄位映射響應（results 與請求 documents 順序一致）"""
+    success: bool
+    results: list[MapFieldsResponse]
+    total: int
@@ -0,0 +1,439 @@
+"""
+@fileoverview 規則正則引擎
+@description
+  規則正則來自資料庫（使用者撰寫），以 CPython 回溯式引擎執行時，
+  不良正則（如 (a+)+$）可能在 OCR 文本上發生災難性回溯：
+  - 安裝 google-re2 時，語意可證明一致的正則改以 RE2（線性時間）執行
+  - 其餘正則（反向參照、環視、\b、非多行 $ 等）維持使用 re
+  - 一律先以 re 編譯驗證，無效正則仍拋出 re.error
+  - 安裝 hyperscan 時，一份文件的所有規則正則以單一資料庫掃描一次預篩
+
+@module python-services/mapping/src/mapper/regex_engine
+@since Epic 2 - Story 2.4 (Field Mapping & Extraction)
+@lastModified 2026-10-15
+
+@features
+  - RE2 / re 逐正則選擇，結果記錄於編譯快取
+  - \d \s \w 依 re 的 Unicode 定義展開為明確字元集，與 re 結果一致
+  - 文本無法以 UTF-8 編碼（孤立代理字元）時改由 re 執行
+  - Hyperscan 預篩（只會多報、不會漏報）排除確定不會命中的正則
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Optional, Union
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - google-re2 為可選依賴
+    re2 = None
+
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover - 可選依賴
+    hyperscan = None
+
+# RE2 匹配期間釋放 GIL，多執行緒提取時可平行掃描
+RE2_AVAILABLE = re2 is not None
+
+# 規則正則（提取 / 驗證）編譯快取筆數
+REGEX_CACHE_SIZE = 1024
+
+# RE2 語法與 re 不同的寫法：{,n} 在 RE2 為字面值；(?-...) 可能關閉外部傳入的標誌
+_RE2_UNSAFE_SYNTAX_RE = re.compile(r"\{,|\(\?-")
+# 開頭的全域行內標誌，如 (?i) / (?im)
+_GLOBAL_INLINE_FLAGS_RE = re.compile(r"\(\?([a-zA-Z]+)\)")
+# 含 i 的行內標誌，如 (?i) / (?im) / (?i:...)
+_INLINE_IGNORECASE_RE = re.compile(r"\(\?[a-zA-Z-]*i")
+# 可直接交給 RE2 的跳脫字元（語意與 re 相同）
+_RE2_PASSTHROUGH_ESCAPES = frozenset("tnrfvax")
+# 忽略大小寫時 re 將 i / I 與 İ（U+0130）、ı（U+0131）視為相同，RE2 不會
+_DOTLESS_DOTTED_I = "\\x{130}\\x{131}"
+# Hyperscan 與 re 語意不同的寫法：{,n} 為字面值、[:alpha:] 為 POSIX 類別、
+# (?#...) 後的量詞、\N{...} / \u / \U 在 re 為具名 / Unicode 字元
+_HS_UNSAFE_PATTERN_RE = re.compile(r"\{,|\[:\^?[A-Za-z]+:\]|\(\?#|\\[NuU]")
+# re 的 \s 涵蓋 \x1c-\x1f，PCRE 不涵蓋；含這些字元的文本不預篩
+_HS_UNSAFE_TEXT_CHARS = "\x1c\x1d\x1e\x1f"
+# 預篩的最短文本：實測 hyperscan 對短文本（約 70 字元以內）中恰好結束於結尾的命中
+# 可能漏報；短文本逐一搜尋的成本本就不高
+PREFILTER_MIN_TEXT_LENGTH = 256
+# Hyperscan 預篩資料庫快取筆數（同一 Forwarder 的文件正則集合相同）
+PREFILTER_CACHE_SIZE = 64
+
+
+def _class_ranges(category: str) -> str:
+    """
+    依 re 的定義計算 \\d / \\s / \\w 的字元範圍，輸出 RE2 字元集內容
+
+    RE2 的 \\d \\s \\w 僅含 ASCII，re 則依 Unicode 判斷；
+    直接以 re 掃描全部碼位，可確保展開後的字元集與 re 完全一致。
+    """
+    ranges = []
+    for match in re.finditer(category + "+", _ALL_CHARACTERS):
+        start, end = match.start(), match.end() - 1
+        start = start + 0x800 if start >= 0xD800 else start
+        end = end + 0x800 if end >= 0xD800 else end
+        ranges.append(f"\\x{{{start:X}}}-\\x{{{end:X}}}")
+    return "".join(ranges)
+
+
+if re2 is not None:
+    # 所有碼位（略過代理字元區段 D800–DFFF，_class_ranges 會換算回原碼位）
+    _ALL_CHARACTERS = "".join(map(chr, range(0xD800))) + "".join(
+        map(chr, range(0xE000, sys.maxunicode + 1))
+    )
+    _CLASS_BODIES = {name: _class_ranges("\\" + name) for name in "dsw"}
+    del _ALL_CHARACTERS
+
+
+class _Re2Pattern:
+    """
+    RE2 編譯結果
+
+    search / match 介面與 re.Pattern 相同；文本無法以 UTF-8 編碼時改用 re。
+    """
+
+    __slots__ = ("pattern", "_re2", "_fallback")
+
+    def __init__(self, compiled_re2, fallback: re.Pattern):
+        self.pattern = fallback.pattern
+        self._re2 = compiled_re2
+        self._fallback = fallback
+
+    def search(self, text: str):
+        try:
+            return self._re2.search(text)
+        except UnicodeEncodeError:
+            return self._fallback.search(text)
+
+    def match(self, text: str):
+        try:
+            return self._re2.match(text)
+        except UnicodeEncodeError:
+            return self._fallback.match(text)
+
+
+RulePattern = Union[re.Pattern, _Re2Pattern]
+
+
+def _class_contains_i(class_source: str) -> bool:
+    """判斷字元集（原始寫法，如 [a-z] / [^0-9]）是否包含 i 或 I"""
+    compiled = re.compile(class_source)
+    if class_source.startswith("[^"):
+        return not (compiled.match("i") and compiled.match("I"))
+    return bool(compiled.match("i") or compiled.match("I"))
+
+
+def _translate_escape(escaped: str, in_class: bool, ignorecase: bool) -> Optional[str]:
+    """轉換單一跳脫序列，無法保證語意一致時回傳 None"""
+    if escaped in "dsw":
+        body = _CLASS_BODIES[escaped]
+        return body if in_class else f"[{body}]"
+    if escaped in "DSW":
+        return None if in_class else f"[^{_CLASS_BODIES[escaped.lower()]}]"
+    if escaped == "x" and ignorecase:
+        return None
+    if escaped in _RE2_PASSTHROUGH_ESCAPES or (
+        escaped.isascii() and not escaped.isalnum() and not escaped.isspace()
+    ):
+        return "\\" + escaped
+    return None
+
+
+def _translate_for_re2(pattern: str, flags: int) -> Optional[str]:
+    """
+    將正則轉為語意相同的 RE2 正則
+
+    只接受可確定兩引擎結果一致的寫法，其餘回傳 None 改用 re：
+    - \\d \\s \\w 展開為 re 的 Unicode 字元集；\\b、反向參照、\\A 等不轉換
+    - 非多行模式的 $（re 可匹配結尾換行之前）不轉換
+    - 佔有量詞（如 a{2}+，RE2 會解讀為重複）不轉換
+    - 重複的捕獲群組（空字串迭代時兩者保留的群組值不同）不轉換
+    - 重複的群組內含非貪婪量詞（如 (?:.??a?)*，空字串迭代的停止時機不同）不轉換
+    - 忽略大小寫時僅接受 ASCII 正則，並補上 re 額外視為 i 的 İ / ı
+      （字元類別中插在開頭，[\w.-] 結尾的 - 仍為字面字元）
+
+    Args:
+        pattern: 正則表達式
+        flags: re 標誌（IGNORECASE / MULTILINE / DOTALL）
+
+    Returns:
+        RE2 正則或 None
+    """
+    if _RE2_UNSAFE_SYNTAX_RE.search(pattern):
+        return None
+
+    inline_flags = ""
+    global_flags = _GLOBAL_INLINE_FLAGS_RE.match(pattern)
+    if global_flags:
+        inline_flags = global_flags.group(1)
+    for inline in _INLINE_IGNORECASE_RE.finditer(pattern):
+        # 區域性的 (?i:...) 無法整體套用 İ / ı 補正
+        if inline.start() != 0 or not global_flags:
+            return None
+
+    ignorecase = bool(flags & re.IGNORECASE) or "i" in inline_flags
+    multiline = bool(flags & re.MULTILINE) or "m" in inline_flags
+    if ignorecase and not pattern.isascii():
+        return None
+
+    out = []
+    # 開啟中的群組：是否含捕獲群組、是否含非貪婪量詞
+    groups: list[bool] = []
+    lazy_groups: list[bool] = []
+    after_quantifier = False
+    after_capture_group = False
+    after_lazy_group = False
+    i = 0
+    length = len(pattern)
+
+    while i < length:
+        char = pattern[i]
+
+        if char == "\\":
+            if i + 1 >= length:
+                return None
+            translated = _translate_escape(pattern[i + 1], False, ignorecase)
+            if translated is None:
+                return None
+            out.append(translated)
+            i += 2
+            after_quantifier = after_capture_group = after_lazy_group = False
+            continue
+
+        if char == "[":
+            class_start = i
+            i += 1
+            if pattern.startswith("^", i):
+                i += 1
+            content_start = i
+            out.append(pattern[class_start:i])
+            # İ / ı 補正插在類別開頭：接在結尾會讓結尾的 - 變成範圍（如 [\w.-]）
+            extra_at = len(out)
+            while True:
+                if i >= length:
+                    return None
+                char = pattern[i]
+                if char == "\\":
+                    if i + 1 >= length:
+                        return None
+                    translated = _translate_escape(pattern[i + 1], True, ignorecase)
+                    if translated is None:
+                        return None
+                    out.append(translated)
+                    i += 2
+                    continue
+                if char == "[":
+                    return None
+                if i == content_start and char in "]-":
+                    # 開頭的 ] / - 為字面字元，補正插入其前方後需跳脫
+                    out.append("\\" + char)
+                    i += 1
+                    continue
+                if char == "]" and i > content_start:
+                    break
+                out.append(char)
+                i += 1
+            if ignorecase and _class_contains_i(pattern[class_start:i + 1]):
+                out.insert(extra_at, _DOTLESS_DOTTED_I)
+            out.append("]")
+            i += 1
+            after_quantifier = after_capture_group = after_lazy_group = False
+            continue
+
+        if char == "(":
+            capturing = not pattern.startswith("(?", i) or pattern.startswith("(?P<", i)
+            groups.append(capturing)
+            lazy_groups.append(False)
+            if pattern.startswith("(?P<", i):
+                end = pattern.find(">", i)
+                if end < 0:
+                    return None
+                end += 1
+            else:
+                end = i + 1
+                if pattern.startswith("?", end):
+                    end += 1
+                    while end < length and pattern[end].isalpha():
+                        end += 1
+            out.append(pattern[i:end])
+            i = end
+            after_quantifier = after_capture_group = after_lazy_group = False
+            continue
+
+        if char == ")":
+            if not groups:
+                return None
+            has_capture = groups.pop()
+            has_lazy = lazy_groups.pop()
+            if groups:
+                groups[-1] = groups[-1] or has_capture
+                lazy_groups[-1] = lazy_groups[-1] or has_lazy
+            out.append(char)
+            i += 1
+            after_quantifier = False
+            after_capture_group = has_capture
+            after_lazy_group = has_lazy
+            continue
+
+        if char in "*+?{":
+            if after_capture_group or (char == "+" and after_quantifier):
+                return None
+            if after_lazy_group and char != "?":
+                return None
+            if char == "?" and after_quantifier and lazy_groups:
+                lazy_groups[-1] = True
+        elif char == "$" and not multiline:
+            return None
+
+        if ignorecase and char in "iI":
+            out.append(f"[iI{_DOTLESS_DOTTED_I}]")
+        else:
+            out.append(char)
+        after_quantifier = char in "*+?}"
+        after_capture_group = after_lazy_group = False
+        i += 1
+
+    if groups:
+        return None
+
+    prefix = ""
+    if flags & re.IGNORECASE:
+        prefix += "(?i)"
+    if flags & re.MULTILINE:
+        prefix += "(?m)"
+    if flags & re.DOTALL:
+        prefix += "(?s)"
+    return prefix + "".join(out)
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_rule_regex(pattern: str, flags: int = 0) -> RulePattern:
+    """
+    編譯規則中的正則（快取）
+
+    規則來自資料庫，同一組正則會在每份文件重複使用；無效正則不會被快取，
+    re.error 照常拋出由呼叫端處理。可由 RE2 執行的正則回傳 RE2 版本。
+
+    Args:
+        pattern: 正則表達式
+        flags: re 標誌
+
+    Returns:
+        編譯後的正則（re.Pattern 或 RE2 版本）
+    """
+    compiled = re.compile(pattern, flags)
+    if re2 is None:
+        return compiled
+
+    translated = _translate_for_re2(pattern, flags)
+    if translated is None:
+        return compiled
+
+    try:
+        return _Re2Pattern(re2.compile(translated), compiled)
+    except re2.error:
+        return compiled
+
+
+def _hyperscan_flags(flags: int) -> int:
+    """re 標誌（IGNORECASE / MULTILINE / DOTALL）轉為 Hyperscan 預篩標誌"""
+    # 不加 HS_FLAG_ALLOWEMPTY：可匹配空字串的正則幾乎必定命中，預篩無益，
+    # 使其無法編譯而不納入預篩
+    hs_flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH
+    if flags & re.IGNORECASE:
+        hs_flags |= hyperscan.HS_FLAG_CASELESS
+    if flags & re.MULTILINE:
+        hs_flags |= hyperscan.HS_FLAG_MULTILINE
+    if flags & re.DOTALL:
+        hs_flags |= hyperscan.HS_FLAG_DOTALL
+    return hs_flags
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def _prefilter_expression(pattern: str, flags: int) -> Optional[bytes]:
+    """Hyperscan 可預篩的正則（快取）；無法編譯或語意可能不同時回傳 None"""
+    if not pattern.isascii() or _HS_UNSAFE_PATTERN_RE.search(pattern):
+        return None
+    expression = pattern.encode("ascii")
+    try:
+        hyperscan.Database().compile(
+            expressions=[expression], ids=[0], elements=1, flags=_hyperscan_flags(flags)
+        )
+    except hyperscan.error:
+        return None
+    return expression
+
+
+@lru_cache(maxsize=PREFILTER_CACHE_SIZE)
+def _prefilter_database(regexes: tuple[tuple[str, int], ...]):
+    """
+    以正則集合建立 Hyperscan 預篩資料庫（快取）
+
+    Args:
+        regexes: 不重複的 (正則, re 標誌)，正則皆已確認 re 可編譯
+
+    Returns:
+        (資料庫, 納入預篩的正則索引)；沒有可納入的正則時為 None
+    """
+    expressions: list[bytes] = []
+    ids: list[int] = []
+    hs_flags: list[int] = []
+    for index, (pattern, flags) in enumerate(regexes):
+        expression = _prefilter_expression(pattern, flags)
+        if expression is not None:
+            expressions.append(expression)
+            ids.append(index)
+            hs_flags.append(_hyperscan_flags(flags))
+
+    if not expressions:
+        return None
+
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions,
+        ids=ids,
+        elements=len(expressions),
+        flags=hs_flags,
+    )
+    return database, ids
+
+
+def prefilter_rule_regexes(
+    regexes: tuple[tuple[str, int], ...], text: str
+) -> set[tuple[str, int]]:
+    """
+    一次掃描找出確定不會命中的規則正則
+
+    以 PREFILTER 模式編譯（只會多報、不會漏報），未回報的正則 search 不會命中；
+    Hyperscan 無法處理的正則不納入，照常逐一搜尋。僅處理夠長的 ASCII 文本
+    （re 的 \\w / \\d 與忽略大小寫在非 ASCII 文本上採 Unicode 語意）。
+
+    Args:
+        regexes: 不重複的 (正則, re 標誌)，正則皆已確認 re 可編譯
+        text: OCR 文本
+
+    Returns:
+        確定不會命中的 (正則, re 標誌) 集合；無法預篩時為空集合
+    """
+    if (
+        hyperscan is None
+        or len(text) < PREFILTER_MIN_TEXT_LENGTH
+        or not text.isascii()
+        or any(char in text for char in _HS_UNSAFE_TEXT_CHARS)
+    ):
+        return set()
+
+    prefilter = _prefilter_database(regexes)
+    if prefilter is None:
+        return set()
+
+    database, ids = prefilter
+    hits: set[int] = set()
+
+    def on_match(regex_id, start, end, flags, context):
+        hits.add(regex_id)
+
+    database.scan(text.encode("ascii"), match_event_handler=on_match)
+    return {regexes[index] for index in ids if index not in hits}
@@ -193,6 +193,8 @@ async function callOcrService(
       body: JSON.stringify({
         documentUrl,
         documentId,
+        // rawResult 需持久化至 OcrResult，須明確要求
+        includeRaw: true,
       }),
       signal: controller.signal,
     })